@@ -0,0 +1,221 @@
+"""
+Client HTTP partagé pour l'API d'archive Open-Meteo.
+
+Une seule session `requests` par processus garde les connexions ouvertes
+(keep-alive) entre les appels. Les erreurs transitoires (429, 5xx, coupures
+réseau) sont réessayées avec un backoff exponentiel aléatoire, et la latence
+de chaque appel est mesurée. Toutes les requêtes, quel que soit le chemin
+appelant, passent par un limiteur commun qui respecte les quotas du fournisseur,
+et par un disjoncteur qui coupe les appels pendant une panne de l'API.
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from circuit_breaker import CircuitBreaker
+from rate_limit import QuotaLimiter
+
+# URL de l'API, remplaçable par un serveur local (voir fake_archive.py)
+ARCHIVE_URL = os.environ.get("OPEN_METEO_ARCHIVE_URL", "https://archive-api.open-meteo.com/v1/archive")
+
+# Délais (secondes), configurables par variables d'environnement
+CONNECT_TIMEOUT = float(os.environ.get("OPEN_METEO_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.environ.get("OPEN_METEO_READ_TIMEOUT", "15"))
+# Durée maximale d'un appel, réessais, attentes et quota compris
+TOTAL_TIMEOUT = float(os.environ.get("OPEN_METEO_TOTAL_TIMEOUT", "30"))
+
+# Réessais avec backoff exponentiel et jitter
+MAX_RETRIES = int(os.environ.get("OPEN_METEO_MAX_RETRIES", "3"))
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Délai minimal laissé à une tentative quand l'échéance globale est proche
+MIN_ATTEMPT_TIMEOUT = 0.5
+
+POOL_SIZE = 16
+
+# Quotas côté client, un peu sous les limites de l'API gratuite (600 / min, 10 000 / jour)
+QUOTA_PER_MINUTE = int(os.environ.get("OPEN_METEO_QUOTA_PER_MINUTE", "500"))
+QUOTA_PER_DAY = int(os.environ.get("OPEN_METEO_QUOTA_PER_DAY", "9000"))
+
+# Appels consécutifs sans attente autorisés par le seau de lissage
+QUOTA_BURST = int(os.environ.get("OPEN_METEO_QUOTA_BURST", "10"))
+
+# Disjoncteur : échecs consécutifs avant ouverture, durée d'ouverture (secondes)
+BREAKER_THRESHOLD = int(os.environ.get("OPEN_METEO_BREAKER_THRESHOLD", "3"))
+BREAKER_COOLDOWN = float(os.environ.get("OPEN_METEO_BREAKER_COOLDOWN", "60"))
+
+# Attente maximale d'un jeton avant d'abandonner l'appel (secondes)
+QUOTA_TIMEOUT = float(os.environ.get("OPEN_METEO_QUOTA_TIMEOUT", "10"))
+
+logger = logging.getLogger(__name__)
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+# Dernières mesures : (horodatage, latence en secondes, statut HTTP ou 0, tentatives)
+_latencies: Deque[Tuple[float, float, int, int]] = deque(maxlen=500)
+_latencies_lock = threading.Lock()
+
+limiter = QuotaLimiter({"minute": (QUOTA_PER_MINUTE, 60), "jour": (QUOTA_PER_DAY, 86400)},
+                       rate_per_second=QUOTA_PER_MINUTE / 60, burst=QUOTA_BURST)
+breaker = CircuitBreaker(BREAKER_THRESHOLD, BREAKER_COOLDOWN)
+
+
+class QuotaExceeded(requests.exceptions.RequestException):
+    """
+    Le quota d'appels ne permet pas d'envoyer la requête avant l'échéance.
+    """
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """
+    Le disjoncteur est ouvert : l'API est considérée indisponible, aucun appel n'est fait.
+    """
+
+
+def get_session() -> requests.Session:
+    """
+    Retourne la session HTTP partagée du processus (pool de connexions).
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def backoff_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """
+    Délai avant la tentative suivante : "full jitter" sur base * 2^attempt,
+    ou la valeur de l'en-tête Retry-After si le serveur en fournit une.
+    """
+    if retry_after:
+        try:
+            return min(BACKOFF_MAX, max(0.0, float(retry_after)))
+        except ValueError:
+            pass
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+def _record_latency(latency: float, status: int, attempts: int) -> None:
+    with _latencies_lock:
+        _latencies.append((time.time(), latency, status, attempts))
+    logger.info("archive-api %s en %.0f ms (%d tentative(s))", status or "erreur", latency * 1000, attempts)
+
+
+def get_archive(params: Dict[str, object], url: Optional[str] = None,
+                connect_timeout: float = CONNECT_TIMEOUT, read_timeout: float = READ_TIMEOUT,
+                max_retries: int = MAX_RETRIES, quota_timeout: float = QUOTA_TIMEOUT,
+                total_timeout: float = TOTAL_TIMEOUT) -> requests.Response:
+    """
+    Appelle l'API d'archive et retourne la réponse finale.
+
+    Les statuts transitoires et les erreurs réseau sont réessayés jusqu'à
+    `max_retries` fois ; le dernier statut est renvoyé tel quel, la dernière
+    erreur réseau est relevée. Sans `url`, ARCHIVE_URL est utilisée.
+    Aucun réessai n'est tenté s'il ne peut aboutir avant `total_timeout`
+    secondes depuis le début de l'appel, et les délais de chaque tentative
+    sont réduits au temps restant.
+
+    Chaque tentative consomme un jeton du limiteur ; `QuotaExceeded` est levée
+    si aucun jeton n'est disponible dans les `quota_timeout` secondes.
+    Pendant une panne (disjoncteur ouvert), `CircuitOpenError` est levée
+    immédiatement, sans appel réseau.
+    """
+    if not breaker.allow():
+        raise CircuitOpenError(f"API d'archive indisponible, nouvel essai dans {breaker.retry_in():.0f} s")
+    try:
+        response = _get_with_retries(params, url or ARCHIVE_URL, connect_timeout, read_timeout,
+                                     max_retries, quota_timeout, total_timeout)
+    except QuotaExceeded:
+        breaker.release()
+        raise
+    except requests.exceptions.RequestException:
+        breaker.record_failure()
+        raise
+    if response.status_code in RETRY_STATUSES:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return response
+
+
+def _get_with_retries(params: Dict[str, object], url: str, connect_timeout: float,
+                      read_timeout: float, max_retries: int, quota_timeout: float,
+                      total_timeout: float) -> requests.Response:
+    session = get_session()
+    start = time.perf_counter()
+    deadline = start + total_timeout
+    attempt = 0
+    while True:
+        if not limiter.acquire(min(quota_timeout, max(0.0, deadline - time.perf_counter()))):
+            raise QuotaExceeded(f"Quota d'appels à l'API d'archive atteint ({quota_stats_summary()})")
+        remaining = max(MIN_ATTEMPT_TIMEOUT, deadline - time.perf_counter())
+        try:
+            response = session.get(url, params=params,
+                                   timeout=(min(connect_timeout, remaining), min(read_timeout, remaining)))
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            delay = backoff_delay(attempt)
+            if attempt >= max_retries or time.perf_counter() + delay >= deadline:
+                _record_latency(time.perf_counter() - start, 0, attempt + 1)
+                raise
+            time.sleep(delay)
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt >= max_retries:
+                _record_latency(time.perf_counter() - start, response.status_code, attempt + 1)
+                return response
+            delay = backoff_delay(attempt, response.headers.get("Retry-After"))
+            if time.perf_counter() + delay >= deadline:
+                _record_latency(time.perf_counter() - start, response.status_code, attempt + 1)
+                return response
+            time.sleep(delay)
+        attempt += 1
+
+
+def latency_stats() -> Dict[str, float]:
+    """
+    Résumé des latences récentes (millisecondes) : nombre d'appels, médiane, p95, dernier.
+    """
+    with _latencies_lock:
+        latencies = sorted(entry[1] for entry in _latencies)
+        last = _latencies[-1][1] if _latencies else 0.0
+    if not latencies:
+        return {"calls": 0, "p50_ms": 0.0, "p95_ms": 0.0, "last_ms": 0.0}
+    return {
+        "calls": len(latencies),
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000,
+        "last_ms": last * 1000,
+    }
+
+
+def quota_stats() -> Dict[str, object]:
+    """
+    Consommation des quotas du limiteur partagé (voir QuotaLimiter.stats).
+    """
+    return limiter.stats()
+
+
+def breaker_stats() -> Dict[str, object]:
+    """
+    État du disjoncteur de l'API d'archive (voir CircuitBreaker.stats).
+    """
+    return breaker.stats()
+
+
+def quota_stats_summary() -> str:
+    windows = limiter.stats()["windows"]
+    return ", ".join(f"{name}: {w['calls']}/{w['limit']}" for name, w in windows.items())
@@ -0,0 +1,87 @@
+"""
+Mesure du décodage des réponses de l'archive : ancien chemin (json + analyse
+de chaque date + DataFrame + dropna) contre le chemin rapide de weather_fetch.
+
+Exemple :
+    python bench_parse.py --years 10 --repeat 20
+"""
+
+import argparse
+import json
+import time
+from datetime import date, timedelta
+from typing import Callable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from weather_fetch import DAILY_VARIABLES, loads, orjson, parse_daily_arrays
+
+
+def make_payload(years: int, seed: int = 0) -> bytes:
+    """
+    Réponse synthétique au format de l'API, avec quelques valeurs nulles en fin de série.
+    """
+    rng = np.random.default_rng(seed)
+    start = date(2000, 1, 1)
+    n_days = (date(2000 + years, 1, 1) - start).days
+    times = [(start + timedelta(days=i)).isoformat() for i in range(n_days)]
+    daily = {"time": times}
+    for variable in DAILY_VARIABLES.values():
+        values = np.round(rng.normal(12, 8, n_days), 1).tolist()
+        values[-5:] = [None] * 5
+        daily[variable] = values
+    return json.dumps({"latitude": 48.85, "longitude": 2.35, "daily": daily}).encode("utf-8")
+
+
+def legacy_parse(raw: bytes, variable: str) -> pd.DataFrame:
+    json_data = json.loads(raw)
+    df = pd.DataFrame({
+        "date": pd.to_datetime(json_data["daily"]["time"]),
+        "temperature": json_data["daily"][variable],
+    })
+    return df.dropna()
+
+
+def fast_parse(raw: bytes, variable: str) -> pd.DataFrame:
+    start, arrays = parse_daily_arrays(loads(raw), [variable])
+    values = arrays[variable]
+    present = ~np.isnan(values)
+    return pd.DataFrame({
+        "date": pd.date_range(start, periods=len(values), freq="D")[present],
+        "temperature": values[present],
+    })
+
+
+def timeit(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare les chemins de décodage des réponses de l'archive.")
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    raw = make_payload(args.years)
+    variable = DAILY_VARIABLES["max"]
+
+    legacy = legacy_parse(raw, variable)
+    fast = fast_parse(raw, variable)
+    assert legacy["date"].tolist() == fast["date"].tolist()
+    assert np.allclose(legacy["temperature"].to_numpy(dtype=float), fast["temperature"].to_numpy())
+
+    legacy_s = timeit(lambda: legacy_parse(raw, variable), args.repeat)
+    fast_s = timeit(lambda: fast_parse(raw, variable), args.repeat)
+    print(f"{args.years} ans, {len(raw) / 1024:.0f} Ko, décodeur: {'orjson' if orjson else 'json'}")
+    print(f"ancien chemin : {legacy_s * 1000:8.2f} ms")
+    print(f"chemin rapide : {fast_s * 1000:8.2f} ms  (x{legacy_s / fast_s:.1f})")
+
+
+if __name__ == "__main__":
+    main()
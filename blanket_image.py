@@ -0,0 +1,47 @@
+"""
+Aperçu de la couverture en image.
+
+Les indices de couleur des jours sont convertis en un tableau RGB
+(jours x largeur) d'un seul coup, puis encodés en une image PNG : le
+navigateur reçoit une image au lieu d'un élément HTML par jour.
+"""
+
+from io import BytesIO
+from typing import Sequence
+
+import numpy as np
+from matplotlib import image as mpimg
+
+DEFAULT_WIDTH = 300
+DEFAULT_ROW_HEIGHT = 3
+
+
+def palette_rgb(colors: Sequence[str]) -> np.ndarray:
+    """
+    Couleurs hexadécimales ("#RRGGBB") -> tableau (n, 3) uint8.
+    """
+    return np.array([[int(color.lstrip("#")[i:i + 2], 16) for i in (0, 2, 4)] for color in colors],
+                    dtype=np.uint8)
+
+
+def render_rgb(indices: np.ndarray, colors: Sequence[str], width: int = DEFAULT_WIDTH,
+               row_height: int = DEFAULT_ROW_HEIGHT, scale: int = 1) -> np.ndarray:
+    """
+    Image RGB (hauteur x largeur x 3) : une bande de `row_height` pixels par
+    jour, sur `width` pixels, le tout agrandi d'un facteur entier `scale`.
+    """
+    rows = palette_rgb(colors)[np.asarray(indices, dtype=np.intp)]
+    rows = np.repeat(rows, row_height * scale, axis=0)
+    return np.broadcast_to(rows[:, None, :], (len(rows), width * scale, 3))
+
+
+def render_png(indices: np.ndarray, colors: Sequence[str], width: int = DEFAULT_WIDTH,
+               row_height: int = DEFAULT_ROW_HEIGHT, scale: int = 1) -> bytes:
+    """
+    Aperçu encodé en PNG. Avec `row_height=1`, chaque jour occupe exactement
+    une ligne de pixels (avant agrandissement).
+    """
+    buffer = BytesIO()
+    mpimg.imsave(buffer, np.ascontiguousarray(render_rgb(indices, colors, width, row_height, scale)),
+                 format="png")
+    return buffer.getvalue()
@@ -0,0 +1,115 @@
+"""
+Préchargement en masse des températures dans le cache persistant.
+
+Les tâches (ville, année, variable) sont regroupées par lieu (maille de
+grille si l'alignement est activé), les années déjà en cache sont ignorées
+et les années manquantes sont demandées par plages consécutives. Les appels
+réseau tournent en parallèle dans un pool de threads borné, avec un débit
+lissé par hôte ; les quotas globaux sont appliqués par archive_client.
+"""
+
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from archive_client import ARCHIVE_URL
+from cities import CITIES
+from grid import location_key
+from weather_cache import WeatherCache, get_cache
+from weather_fetch import DAILY_VARIABLES, fetch_daily_records, year_spans
+
+DEFAULT_WORKERS = 8
+DEFAULT_RATE_PER_SECOND = 5.0
+
+
+class HostRateLimiter:
+    """
+    Espace les appels vers un même hôte d'au moins 1 / rate_per_second secondes.
+    """
+
+    def __init__(self, rate_per_second: float = DEFAULT_RATE_PER_SECOND):
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._next_slot: Dict[str, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def wait(self, host: str) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot[host])
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def bulk_fetch(jobs: Iterable[Tuple[str, int, str]],
+               cache: Optional[WeatherCache] = None,
+               max_workers: int = DEFAULT_WORKERS,
+               rate_per_second: float = DEFAULT_RATE_PER_SECOND,
+               on_progress: Optional[Callable[[int, int], None]] = None) -> List[Dict[str, object]]:
+    """
+    Récupère en parallèle une liste de tâches (ville, année, type de température)
+    et écrit les résultats dans le cache.
+
+    Retourne une ligne par tâche : ville, année, variable et statut
+    ("cached", "fetched" ou "error", avec le message d'erreur).
+    """
+    cache = cache or get_cache()
+    limiter = HostRateLimiter(rate_per_second)
+    host = urlparse(ARCHIVE_URL).netloc
+
+    # Regrouper par lieu : les trois variables arrivent ensemble, et les
+    # villes d'une même maille de grille partagent leurs données
+    years_by_location: Dict[Tuple[float, float], set] = defaultdict(set)
+    location_of: Dict[str, Tuple[float, float]] = {}
+    jobs = list(jobs)
+    for city, year, variable in jobs:
+        if city not in CITIES:
+            raise KeyError(f"Ville '{city}' non prise en charge")
+        if variable not in DAILY_VARIABLES:
+            raise KeyError(f"Type de température '{variable}' inconnu")
+        if city not in location_of:
+            location_of[city] = location_key(*CITIES[city])
+        years_by_location[location_of[city]].add(int(year))
+
+    status: Dict[Tuple[Tuple[float, float], int], str] = {}
+    tasks = []
+    for location, years in years_by_location.items():
+        missing = []
+        for year in sorted(years):
+            if cache.get_record(*location, year, DAILY_VARIABLES.values()) is None:
+                missing.append(year)
+            else:
+                status[(location, year)] = "cached"
+        for first_year, last_year in year_spans(missing):
+            tasks.append((location, list(range(first_year, last_year + 1))))
+
+    def run(location: Tuple[float, float], years: List[int]) -> Dict[int, str]:
+        limiter.wait(host)
+        records = fetch_daily_records(*location, years, cache)
+        return {year: "fetched" if year in records else "error: aucune donnée" for year in years}
+
+    total = len(tasks)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(run, location, years): (location, years) for location, years in tasks}
+        for done, future in enumerate(as_completed(futures), start=1):
+            location, years = futures[future]
+            try:
+                for year, result in future.result().items():
+                    status[(location, year)] = result
+            except Exception as e:
+                for year in years:
+                    status[(location, year)] = f"error: {e}"
+            if on_progress:
+                on_progress(done, total)
+
+    results = []
+    for city, year, variable in jobs:
+        result = status[(location_of[city], int(year))]
+        row = {"city": city, "year": int(year), "variable": variable, "status": result.split(":")[0]}
+        if result.startswith("error"):
+            row["error"] = result.split(": ", 1)[1]
+        results.append(row)
+    return results
@@ -0,0 +1,106 @@
+"""
+Disjoncteur pour un service distant.
+
+Après `failure_threshold` échecs consécutifs, le circuit s'ouvre : les appels
+sont refusés immédiatement pendant `cooldown` secondes, ce qui évite à chaque
+utilisateur d'attendre un délai d'expiration. Ensuite, une seule requête
+d'essai (état semi-ouvert) est autorisée : son succès referme le circuit,
+son échec le rouvre pour une nouvelle période.
+"""
+
+import threading
+import time
+from typing import Callable, Dict
+
+CLOSED = "fermé"
+OPEN = "ouvert"
+HALF_OPEN = "semi-ouvert"
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur partagé entre threads.
+    """
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.short_circuited = 0
+        self.trips = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(self.clock())
+
+    def _current_state(self, now: float) -> str:
+        if self._state == OPEN and now - self._opened_at >= self.cooldown:
+            self._state = HALF_OPEN
+            self._probing = False
+        return self._state
+
+    def allow(self) -> bool:
+        """
+        Indique si un appel peut partir. En semi-ouvert, seul le premier
+        appelant (la requête d'essai) est autorisé.
+        """
+        with self._lock:
+            state = self._current_state(self.clock())
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.short_circuited += 1
+            return False
+
+    def retry_in(self) -> float:
+        """
+        Secondes avant la prochaine requête d'essai (0 si le circuit n'est pas ouvert).
+        """
+        with self._lock:
+            if self._current_state(self.clock()) != OPEN:
+                return 0.0
+            return max(0.0, self.cooldown - (self.clock() - self._opened_at))
+
+    def release(self) -> None:
+        """
+        Abandonne un appel autorisé sans résultat (la requête d'essai pourra repartir).
+        """
+        with self._lock:
+            self._probing = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self.trips += 1
+                self._state = OPEN
+                self._opened_at = self.clock()
+                self._probing = False
+
+    def stats(self) -> Dict[str, object]:
+        """
+        État du circuit, échecs consécutifs, appels court-circuités et nombre d'ouvertures.
+        """
+        with self._lock:
+            return {
+                "state": self._current_state(self.clock()),
+                "failures": self._failures,
+                "short_circuited": self.short_circuited,
+                "trips": self.trips,
+            }
@@ -0,0 +1,169 @@
+"""
+Climatologie par lieu, calculée à partir de l'historique en cache.
+
+Pour chaque jour du calendrier (366 positions, 29 février compris), on
+garde la normale, l'écart type et les percentiles 10 / 50 / 90 des années
+en cache, en int16 dixièmes de degré comme les séries. Ces tableaux sont
+enregistrés dans le cache sous l'année 0 (clé `clim:<statistique>:<variable>`)
+et gardés en mémoire : une fois calculée, la climatologie d'un lieu
+s'obtient par une simple recherche dans un dictionnaire.
+"""
+
+import threading
+import time
+import warnings
+from datetime import date
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from compact_series import CompactSeries
+from grid import location_key
+from weather_cache import WeatherCache, get_cache
+from weather_fetch import DAILY_VARIABLES
+
+# Année fictive des entrées de climatologie dans le cache
+CLIMATOLOGY_YEAR = 0
+
+# Les statistiques sont recalculées une fois par semaine
+CLIMATOLOGY_TTL = 7 * 24 * 3600
+
+STATISTICS = ("mean", "std", "p10", "p50", "p90")
+
+# Écart type utilisé quand une seule année est disponible
+DEFAULT_STD = 3.0
+
+# Le calendrier de référence est bissextile : 366 positions
+_REFERENCE_START = date(2000, 1, 1)
+
+
+def cache_variable(temp_type: str) -> str:
+    """
+    Clé de cache de la série correspondant à un type de température.
+    """
+    if temp_type in DAILY_VARIABLES:
+        return DAILY_VARIABLES[temp_type]
+    return f"hourly:{temp_type}"
+
+
+def calendar_index(start: date, n_days: int) -> np.ndarray:
+    """
+    Position (0-365) de chaque jour dans le calendrier bissextile de référence.
+    """
+    days = np.datetime64(start, "D") + np.arange(n_days)
+    years = days.astype("datetime64[Y]")
+    day_of_year = (days - years.astype("datetime64[D]")).astype(np.int64)
+    year_numbers = years.astype(np.int64) + 1970
+    leap = (year_numbers % 4 == 0) & ((year_numbers % 100 != 0) | (year_numbers % 400 == 0))
+    # Années non bissextiles : à partir du 1er mars, sauter la position du 29 février
+    return day_of_year + ((~leap) & (day_of_year >= 59))
+
+
+def _fill_gaps(values: np.ndarray) -> np.ndarray:
+    """
+    Interpole les positions sans donnée, en traitant l'année comme circulaire.
+    """
+    known = ~np.isnan(values)
+    if known.all() or not known.any():
+        return values
+    positions = np.arange(len(values))
+    return np.interp(positions, positions[known], values[known], period=len(values))
+
+
+class Climatology:
+    """
+    Statistiques journalières d'un lieu : tableaux int16 (366,) en dixièmes de °C.
+    """
+
+    __slots__ = STATISTICS
+
+    def __init__(self, **arrays: np.ndarray):
+        for name in STATISTICS:
+            setattr(self, name, np.asarray(arrays[name], dtype=np.int16))
+
+    @classmethod
+    def from_history(cls, history: Dict[int, CompactSeries]) -> Optional["Climatology"]:
+        """
+        Calcule la climatologie à partir de séries annuelles ; None sans historique.
+        """
+        if not history:
+            return None
+        block = np.full((len(history), 366), np.nan)
+        for row, series in enumerate(history.values()):
+            block[row, calendar_index(series.start, len(series))] = series.to_floats()
+        if np.isnan(block).all():
+            return None
+
+        with warnings.catch_warnings():
+            # Positions sans aucune donnée : NaN attendu, comblé ensuite
+            warnings.simplefilter("ignore", RuntimeWarning)
+            counts = (~np.isnan(block)).sum(axis=0)
+            stats = {
+                "mean": np.nanmean(block, axis=0),
+                "std": np.where(counts >= 2, np.nanstd(block, axis=0), DEFAULT_STD),
+            }
+            for name, q in zip(("p10", "p50", "p90"), np.nanpercentile(block, [10, 50, 90], axis=0)):
+                stats[name] = q
+        stats["std"] = np.where(counts == 0, np.nan, stats["std"])
+        return cls(**{name: CompactSeries.from_floats(_REFERENCE_START, _fill_gaps(values)).values
+                      for name, values in stats.items()})
+
+    def floats(self, name: str) -> np.ndarray:
+        return getattr(self, name).astype(np.float64) / 10
+
+    def sample_year(self, year: int) -> CompactSeries:
+        """
+        Année simulée : normale du jour + bruit gaussien de l'écart type du jour,
+        bornée par un percentile 10 / 90 élargi. Reproductible pour une année donnée.
+        """
+        start = date(year, 1, 1)
+        n_days = (date(year + 1, 1, 1) - start).days
+        index = calendar_index(start, n_days)
+        rng = np.random.default_rng(year)
+        std = self.floats("std")[index]
+        values = self.floats("mean")[index] + std * rng.standard_normal(n_days)
+        spread = self.floats("p90")[index] - self.floats("p10")[index]
+        values = np.clip(values, self.floats("p10")[index] - spread, self.floats("p90")[index] + spread)
+        return CompactSeries.from_floats(start, values)
+
+
+_index: Dict[Tuple[float, float, str], Tuple[float, Climatology]] = {}
+_index_lock = threading.Lock()
+
+
+def _load(cache: WeatherCache, lat: float, lon: float, variable: str) -> Optional[Climatology]:
+    keys = {name: f"clim:{name}:{variable}" for name in STATISTICS}
+    if not cache.is_stale(lat, lon, CLIMATOLOGY_YEAR, keys["mean"]):
+        arrays = {name: cache.get_series(lat, lon, CLIMATOLOGY_YEAR, key) for name, key in keys.items()}
+        if all(series is not None for series in arrays.values()):
+            return Climatology(**{name: series.values for name, series in arrays.items()})
+
+    climatology = Climatology.from_history(cache.history(lat, lon, variable))
+    if climatology is not None:
+        for name, key in keys.items():
+            cache.put_series(lat, lon, CLIMATOLOGY_YEAR, key,
+                             CompactSeries(_REFERENCE_START, getattr(climatology, name)), CLIMATOLOGY_TTL)
+    return climatology
+
+
+def get_climatology(lat: float, lon: float, temp_type: str,
+                    cache: Optional[WeatherCache] = None) -> Optional[Climatology]:
+    """
+    Climatologie d'un lieu pour un type de température, ou None sans historique.
+    """
+    cache = cache or get_cache()
+    lat, lon = location_key(lat, lon)
+    variable = cache_variable(temp_type)
+    key = (lat, lon, variable)
+    now = time.monotonic()
+    with _index_lock:
+        entry = _index.get(key)
+    if entry is not None and now - entry[0] < CLIMATOLOGY_TTL:
+        return entry[1]
+
+    climatology = _load(cache, lat, lon, variable)
+    if climatology is not None:
+        # Sans historique, rien n'est mémorisé : une récupération ultérieure sera prise en compte
+        with _index_lock:
+            _index[key] = (now, climatology)
+    return climatology
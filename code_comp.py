@@ -5,6 +5,8 @@ import requests
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple
 
+from archive_client import get_archive
+
 # Configuration de la page
 st.set_page_config(
     page_title="Couverture Température - Crochet/Tricot",
@@ -439,15 +441,18 @@ def get_real_temperature_data(lat: float, lon: float, year: int, temp_type: str)
         "moyenne": "temperature_2m_mean"
     }[temp_type]
 
-    url = (
-        "https://archive-api.open-meteo.com/v1/archive?"
-        f"latitude={lat}&longitude={lon}&start_date={start_date}&end_date={end_date}"
-        f"&daily={daily_param}&timezone=auto"
-    )
+    params = {
+        "latitude": lat,
+        "longitude": lon,
+        "start_date": start_date,
+        "end_date": end_date,
+        "daily": daily_param,
+        "timezone": "auto",
+    }
 
     try:
         st.info(f"Récupération des données pour {lat}, {lon} en {year}...")
-        response = requests.get(url, timeout=15)
+        response = get_archive(params)
         
         if response.status_code == 200:
             json_data = response.json()
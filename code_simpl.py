@@ -5,6 +5,8 @@ import requests
 from datetime import datetime, timedelta
 from typing import List, Tuple
 
+from archive_client import get_archive
+
 st.set_page_config(page_title="Couverture Température", page_icon="🧶", layout="wide")
 
 if 'project_data' not in st.session_state:
@@ -36,14 +38,20 @@ def fetch_real_temperature_data(city: str, year: int) -> pd.DataFrame:
     start = f"{year}-01-01"
     end = f"{year}-12-31"
     
-    url = (
-        f"https://archive-api.open-meteo.com/v1/archive?"
-        f"latitude={lat}&longitude={lon}&start_date={start}&end_date={end}"
-        f"&daily=temperature_2m_max&timezone=auto"
-    )
+    params = {
+        "latitude": lat,
+        "longitude": lon,
+        "start_date": start,
+        "end_date": end,
+        "daily": "temperature_2m_max",
+        "timezone": "auto",
+    }
     
-    r = requests.get(url)
-    data = r.json()
+    try:
+        r = get_archive(params)
+        data = r.json()
+    except (requests.exceptions.RequestException, ValueError):
+        data = {}
     
     if "daily" not in data:
         st.error("Erreur de récupération des données météo.")
@@ -0,0 +1,210 @@
+"""
+Correspondance température -> couleur de laine, calculée sur toute une série.
+
+Les fonctions prennent un tableau de températures et retournent un tableau
+d'indices dans la palette, en une seule opération NumPy : les pages
+appliquent ensuite ces indices aux couleurs et aux noms de laine. Toutes
+les correspondances passent par un seul moteur : une recherche dichotomique
+dans des seuils triés (réguliers, propres à la palette ou quantiles).
+
+Pour une palette et une plage données, les indices de toutes les
+températures au dixième de degré sont précalculés une fois dans une table
+(LUT) : convertir une série revient alors à une seule lecture indexée.
+Les tables sont gardées dans un cache LRU et retirées quand la palette
+correspondante est modifiée.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MIN_TEMP = -20.0
+DEFAULT_MAX_TEMP = 40.0
+
+# Pas des tables de correspondance : 0,1 °C (précision des séries compactes)
+LUT_STEPS_PER_DEGREE = 10
+
+LUT_CACHE_SIZE = 32
+
+
+def default_breakpoints(n_colors: int, min_temp: float = DEFAULT_MIN_TEMP,
+                        max_temp: float = DEFAULT_MAX_TEMP) -> Tuple[float, ...]:
+    """
+    Seuils réguliers : [min_temp, max_temp] découpée en n_colors tranches de même largeur.
+    """
+    step = (max_temp - min_temp) / n_colors
+    return tuple(round(min_temp + k * step, 2) for k in range(1, n_colors))
+
+
+def validate_breakpoints(breakpoints: Sequence[float], n_colors: int) -> Tuple[float, ...]:
+    """
+    Vérifie des seuils saisis pour une palette (n_colors - 1 valeurs finies,
+    distinctes) et les retourne triés. Lève ValueError sinon.
+    """
+    values = np.asarray(list(breakpoints), dtype=np.float64)
+    if len(values) != n_colors - 1:
+        raise ValueError(f"{n_colors - 1} seuils attendus pour {n_colors} couleurs, {len(values)} reçus")
+    if not np.isfinite(values).all():
+        raise ValueError("Les seuils doivent être des nombres finis")
+    values = np.sort(values)
+    if (np.diff(values) == 0).any():
+        raise ValueError("Les seuils doivent être distincts")
+    return tuple(float(v) for v in values)
+
+
+def palette_breakpoints(palette: Dict[str, List[str]]) -> Tuple[float, ...]:
+    """
+    Seuils d'une palette : ceux qu'elle définit, ou les seuils réguliers sur -20..40 °C.
+    """
+    if palette.get("breakpoints"):
+        return tuple(palette["breakpoints"])
+    return default_breakpoints(len(palette["colors"]))
+
+
+def breakpoint_labels(breakpoints: Sequence[float]) -> List[str]:
+    """
+    Libellé de la tranche de chaque couleur, calculé à partir des mêmes seuils que les couleurs.
+    """
+    if not len(breakpoints):
+        return ["toutes températures"]
+    labels = [f"moins de {breakpoints[0]:.1f}°C"]
+    labels += [f"{low:.1f}°C à {high:.1f}°C" for low, high in zip(breakpoints[:-1], breakpoints[1:])]
+    labels.append(f"{breakpoints[-1]:.1f}°C et plus")
+    return labels
+
+
+def threshold_indices(temperatures: Sequence[float], thresholds: Sequence[float]) -> np.ndarray:
+    """
+    Moteur de correspondance commun : indice de couleur par recherche
+    dichotomique dans des seuils triés. Une température égale à un seuil
+    prend la couleur supérieure ; une température manquante (NaN) prend la
+    première couleur, comme dans les tables (ColorLUT.lookup).
+    """
+    temperatures = np.asarray(temperatures, dtype=np.float64)
+    indices = np.searchsorted(np.asarray(thresholds, dtype=np.float64), temperatures, side="right")
+    return np.where(np.isnan(temperatures), 0, indices)
+
+
+def color_indices(temperatures: Sequence[float], n_colors: int,
+                  min_temp: float = DEFAULT_MIN_TEMP, max_temp: float = DEFAULT_MAX_TEMP) -> np.ndarray:
+    """
+    Indice de couleur (0 à n_colors - 1) de chaque température avec les
+    seuils réguliers sur [min_temp, max_temp] ; les valeurs hors plage
+    prennent la première ou la dernière couleur.
+    """
+    return threshold_indices(temperatures, default_breakpoints(n_colors, min_temp, max_temp))
+
+
+def quantile_thresholds(temperatures: Sequence[float], n_colors: int) -> Tuple[float, ...]:
+    """
+    Seuils (n_colors - 1) qui répartissent les jours en parts égales entre
+    les couleurs, calculés en un seul appel à np.quantile.
+    """
+    temperatures = np.asarray(temperatures, dtype=np.float64)
+    temperatures = temperatures[~np.isnan(temperatures)]
+    if n_colors < 2 or not len(temperatures):
+        return ()
+    quantiles = np.quantile(temperatures, np.linspace(0, 1, n_colors + 1)[1:-1])
+    return tuple(float(q) for q in np.round(quantiles, 2))
+
+
+class ColorLUT:
+    """
+    Indices de couleur précalculés pour chaque dixième de degré entre les
+    températures extrêmes utiles (plage demandée, élargie aux seuils).
+    """
+
+    __slots__ = ("first", "indices")
+
+    def __init__(self, first: int, indices: np.ndarray):
+        # first : température (en dixièmes) de la première case
+        self.first = first
+        self.indices = indices
+
+    @classmethod
+    def build(cls, thresholds: Sequence[float], min_temp: float = DEFAULT_MIN_TEMP,
+              max_temp: float = DEFAULT_MAX_TEMP) -> "ColorLUT":
+        # Au-delà du premier et du dernier seuil, l'indice ne change plus
+        low = min([min_temp] + [t - 1 for t in thresholds])
+        high = max([max_temp] + [t + 1 for t in thresholds])
+        first = int(np.floor(low * LUT_STEPS_PER_DEGREE))
+        last = int(np.ceil(high * LUT_STEPS_PER_DEGREE))
+        grid = np.arange(first, last + 1) / LUT_STEPS_PER_DEGREE
+        return cls(first, threshold_indices(grid, thresholds).astype(np.int16))
+
+    def lookup(self, temperatures: Sequence[float]) -> np.ndarray:
+        """
+        Indices de couleur d'une série, en une seule lecture indexée. Une
+        température manquante (NaN) prend la première couleur, comme dans
+        threshold_indices.
+        """
+        steps = np.rint(np.asarray(temperatures, dtype=np.float64) * LUT_STEPS_PER_DEGREE)
+        # NaN -> première case, sous tous les seuils (voir build) : indice 0
+        positions = np.clip(np.nan_to_num(steps - self.first, nan=0.0), 0, len(self.indices) - 1).astype(np.intp)
+        return self.indices.take(positions).astype(np.intp)
+
+
+# Stratégie : "linear" (seuils réguliers sur [min_temp, max_temp]) ou seuils triés
+BinStrategy = Union[str, Tuple[float, ...]]
+
+_LutKey = Tuple[str, float, float, BinStrategy]
+_luts: "OrderedDict[_LutKey, ColorLUT]" = OrderedDict()
+_luts_lock = threading.Lock()
+_lut_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def get_lut(palette_name: str, n_colors: int, min_temp: float = DEFAULT_MIN_TEMP,
+            max_temp: float = DEFAULT_MAX_TEMP, strategy: BinStrategy = "linear") -> ColorLUT:
+    """
+    Table de correspondance d'une palette, construite au premier appel puis
+    servie depuis le cache LRU (clé : palette, min_temp, max_temp, stratégie).
+    """
+    key = (palette_name, float(min_temp), float(max_temp), strategy)
+    with _luts_lock:
+        lut = _luts.get(key)
+        if lut is not None:
+            _luts.move_to_end(key)
+            _lut_stats["hits"] += 1
+            return lut
+        _lut_stats["misses"] += 1
+
+    thresholds = default_breakpoints(n_colors, min_temp, max_temp) if strategy == "linear" else strategy
+    lut = ColorLUT.build(thresholds, min_temp, max_temp)
+    with _luts_lock:
+        _luts[key] = lut
+        _luts.move_to_end(key)
+        while len(_luts) > LUT_CACHE_SIZE:
+            _luts.popitem(last=False)
+            _lut_stats["evictions"] += 1
+    return lut
+
+
+def evict_palette(palette_name: str) -> int:
+    """
+    Retire les tables d'une palette (après modification). Retourne le nombre de tables retirées.
+    """
+    with _luts_lock:
+        keys = [key for key in _luts if key[0] == palette_name]
+        for key in keys:
+            del _luts[key]
+        _lut_stats["evictions"] += len(keys)
+    return len(keys)
+
+
+def lut_stats() -> Dict[str, int]:
+    with _luts_lock:
+        return dict(_lut_stats, tables=len(_luts))
+
+
+def apply_palette(df: pd.DataFrame, palette: Dict[str, List[str]], indices: np.ndarray) -> pd.DataFrame:
+    """
+    Ajoute au DataFrame les colonnes `color_index`, `color_hex` et `yarn_name`.
+    """
+    return df.assign(
+        color_index=indices,
+        color_hex=np.asarray(palette["colors"])[indices],
+        yarn_name=np.asarray(palette["yarn_colors"])[indices],
+    )
@@ -0,0 +1,97 @@
+"""
+Format compact des séries journalières de température.
+
+Une série est une date de début suivie d'un tableau int16 en dixièmes de
+degré (2 octets par jour au lieu de 16 pour datetime64 + float64). Les
+jours manquants valent MISSING. La conversion en DataFrame n'a lieu que
+lorsque l'interface en a besoin.
+"""
+
+from datetime import date
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+# Valeur sentinelle des jours sans donnée
+MISSING = np.iinfo(np.int16).min
+
+# Dixièmes de degré représentables (hors sentinelle)
+_LIMIT = np.iinfo(np.int16).max
+
+
+class CompactSeries:
+    """
+    Série journalière continue : `start` + valeurs int16 en dixièmes de °C.
+    """
+
+    __slots__ = ("start", "values")
+
+    def __init__(self, start: date, values: np.ndarray):
+        self.start = start
+        self.values = np.asarray(values, dtype=np.int16)
+
+    @classmethod
+    def from_floats(cls, start: date, temperatures: np.ndarray) -> "CompactSeries":
+        temperatures = np.asarray(temperatures, dtype=np.float64)
+        tenths = np.rint(temperatures * 10)
+        missing = np.isnan(tenths)
+        values = np.clip(np.where(missing, 0, tenths), -_LIMIT, _LIMIT).astype(np.int16)
+        values[missing] = MISSING
+        return cls(start, values)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, column: str = "temperature") -> "CompactSeries":
+        """
+        Construit la série depuis un DataFrame (date, temperature) ; les jours absents deviennent MISSING.
+        """
+        dates = pd.to_datetime(df["date"]).dt.normalize()
+        start = dates.min()
+        offsets = (dates - start).dt.days.to_numpy()
+        temperatures = np.full(int(offsets.max()) + 1, np.nan)
+        temperatures[offsets] = df[column].to_numpy(dtype=np.float64)
+        return cls.from_floats(start.date(), temperatures)
+
+    @classmethod
+    def from_bytes(cls, start: Union[date, str], payload: bytes) -> "CompactSeries":
+        if isinstance(start, str):
+            start = date.fromisoformat(start)
+        return cls(start, np.frombuffer(payload, dtype=np.int16))
+
+    def to_bytes(self) -> bytes:
+        return np.ascontiguousarray(self.values, dtype=np.int16).tobytes()
+
+    def to_floats(self) -> np.ndarray:
+        """
+        Températures en °C (float64), NaN pour les jours manquants.
+        """
+        temperatures = self.values.astype(np.float64) / 10
+        temperatures[self.values == MISSING] = np.nan
+        return temperatures
+
+    def dates(self) -> pd.DatetimeIndex:
+        return pd.date_range(self.start, periods=len(self.values), freq="D")
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        DataFrame (date, temperature) utilisé par l'interface, sans les jours manquants.
+        """
+        present = self.values != MISSING
+        return pd.DataFrame({
+            "date": self.dates()[present],
+            "temperature": self.values[present] / 10,
+        })
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, CompactSeries) and self.start == other.start
+                and np.array_equal(self.values, other.values))
+
+    def __repr__(self) -> str:
+        return f"CompactSeries(start={self.start.isoformat()}, days={len(self)})"
@@ -0,0 +1,248 @@
+"""
+Serveur HTTP local imitant l'API d'archive Open-Meteo.
+
+Il rejoue des séries enregistrées (fichiers JSON au format de l'API) ou, à
+défaut, génère des séries synthétiques déterministes. Latence et taux
+d'erreur sont configurables, ce qui permet de mesurer récupération, cache et
+interface sans réseau et de façon reproductible.
+
+Les réponses enregistrées sont indexées par les coordonnées demandées
+(bloc `request` du fichier) et rejouées pour toute demande à moins de
+`FIXTURE_TOLERANCE` degrés ; l'API renvoie en effet le centre de la maille,
+pas les coordonnées demandées.
+
+Exemple :
+    python fake_archive.py --port 8765 --latency-ms 200 --error-rate 0.05
+    OPEN_METEO_ARCHIVE_URL=http://127.0.0.1:8765/v1/archive streamlit run code_comp2.py
+"""
+
+import argparse
+import glob
+import json
+import logging
+import math
+import os
+import random
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+DAILY_OFFSETS = {
+    "temperature_2m_min": -5.0,
+    "temperature_2m_max": 5.0,
+    "temperature_2m_mean": 0.0,
+}
+
+# Écart maximal (en degrés) entre les coordonnées demandées et celles d'une
+# réponse enregistrée pour la rejouer
+FIXTURE_TOLERANCE = 0.1
+
+logger = logging.getLogger(__name__)
+
+
+def synthetic_value(lat: float, lon: float, day: date, variable: str) -> float:
+    """
+    Température synthétique reproductible pour un lieu, un jour et une variable.
+    """
+    # Moyenne annuelle et amplitude saisonnière dépendant de la latitude
+    annual_mean = 28.0 - 0.45 * abs(lat)
+    amplitude = min(18.0, 0.3 * abs(lat))
+    phase = (day.timetuple().tm_yday - 200) / 365.25 * 2 * math.pi
+    seasonal = amplitude * math.cos(phase) * (1 if lat >= 0 else -1)
+    noise = random.Random(f"{lat:.2f}:{lon:.2f}:{day.isoformat()}").gauss(0, 3)
+    return round(annual_mean + seasonal + noise + DAILY_OFFSETS.get(variable, 0.0), 1)
+
+
+def fixture_key(data: dict, path: str) -> Tuple[float, float]:
+    """
+    Coordonnées demandées lors de l'enregistrement : bloc `request`
+    ({"latitude": ..., "longitude": ...}) s'il existe, sinon celles de la
+    réponse (centre de la maille, qui peut différer de la demande).
+    """
+    request = data.get("request")
+    if request is None:
+        logger.warning("%s : pas de bloc 'request', indexé par les coordonnées de la maille", path)
+        request = data
+    return float(request["latitude"]), float(request["longitude"])
+
+
+def load_fixtures(directory: str) -> Dict[Tuple[float, float], dict]:
+    """
+    Charge les réponses enregistrées (*.json) indexées par les coordonnées demandées.
+    """
+    fixtures = {}
+    for path in glob.glob(os.path.join(directory, "*.json")):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        fixtures[fixture_key(data, path)] = data
+    return fixtures
+
+
+def find_fixture(fixtures: Dict[Tuple[float, float], dict], lat: float, lon: float,
+                 tolerance: float = FIXTURE_TOLERANCE) -> Optional[dict]:
+    """
+    Réponse enregistrée la plus proche de (lat, lon), à `tolerance` degrés près au plus.
+    """
+    best, best_distance = None, None
+    for (fixture_lat, fixture_lon), data in fixtures.items():
+        distance = max(abs(fixture_lat - lat), abs(fixture_lon - lon))
+        if distance <= tolerance and (best_distance is None or distance < best_distance):
+            best, best_distance = data, distance
+    return best
+
+
+class ArchiveHandler(BaseHTTPRequestHandler):
+    # Configurés par make_server
+    fixtures: Dict[Tuple[float, float], dict] = {}
+    fixture_tolerance = FIXTURE_TOLERANCE
+    latency_ms = 0.0
+    jitter_ms = 0.0
+    error_rate = 0.0
+    error_status = 503
+    rng = random.Random(0)
+    rng_lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        with self.rng_lock:
+            delay = max(0.0, self.latency_ms + self.rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            fail = self.rng.random() < self.error_rate
+        time.sleep(delay)
+
+        url = urlparse(self.path)
+        if url.path != "/v1/archive":
+            self._send_json(404, {"error": True, "reason": "Not found"})
+            return
+        if fail:
+            self._send_json(self.error_status, {"error": True, "reason": "Erreur simulée"})
+            return
+
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        try:
+            lat = float(query["latitude"])
+            lon = float(query["longitude"])
+            start = date.fromisoformat(query["start_date"])
+            end = date.fromisoformat(query["end_date"])
+        except (KeyError, ValueError) as e:
+            self._send_json(400, {"error": True, "reason": f"Paramètre invalide: {e}"})
+            return
+        if end < start:
+            self._send_json(400, {"error": True, "reason": "end_date avant start_date"})
+            return
+
+        payload = self.build_response(lat, lon, start, end, query.get("daily", ""))
+        if query.get("hourly"):
+            payload["hourly"] = self.build_hourly(lat, lon, start, end, query["hourly"])
+        self._send_json(200, payload)
+
+    def build_hourly(self, lat: float, lon: float, start: date, end: date, hourly: str) -> dict:
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        result = {"time": [f"{d.isoformat()}T{h:02d}:00" for d in days for h in range(24)]}
+        for variable in (v for v in hourly.split(",") if v):
+            # Cycle diurne autour de la moyenne synthétique : minimum vers 5 h, maximum vers 15 h
+            result[variable] = [
+                round(synthetic_value(lat, lon, d, "temperature_2m_mean")
+                      + 5.0 * math.cos((h - 15) / 24 * 2 * math.pi), 1)
+                for d in days for h in range(24)
+            ]
+        return result
+
+    def build_response(self, lat: float, lon: float, start: date, end: date, daily: str) -> dict:
+        variables = [v for v in daily.split(",") if v]
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        times = [d.isoformat() for d in days]
+        payload = {"latitude": lat, "longitude": lon}
+        if not variables:
+            return payload
+        payload["daily"] = {"time": times}
+
+        fixture = find_fixture(self.fixtures, lat, lon, self.fixture_tolerance) if self.fixtures else None
+        if fixture is None and self.fixtures:
+            logger.info("Aucune réponse enregistrée pour (%.4f, %.4f) : série synthétique", lat, lon)
+        if fixture is not None:
+            recorded = fixture["daily"]
+            index = {t: i for i, t in enumerate(recorded["time"])}
+            for variable in variables:
+                values = recorded.get(variable, [])
+                payload["daily"][variable] = [
+                    values[index[t]] if t in index and index[t] < len(values) else None for t in times
+                ]
+        else:
+            for variable in variables:
+                payload["daily"][variable] = [synthetic_value(lat, lon, d, variable) for d in days]
+        return payload
+
+
+def make_server(host: str = "127.0.0.1", port: int = 0, fixtures_dir: Optional[str] = None,
+                latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0,
+                error_status: int = 503, seed: int = 0,
+                fixture_tolerance: float = FIXTURE_TOLERANCE) -> ThreadingHTTPServer:
+    """
+    Crée le serveur (port 0 : port libre choisi par le système).
+    """
+    handler = type("ConfiguredArchiveHandler", (ArchiveHandler,), {
+        "fixtures": load_fixtures(fixtures_dir) if fixtures_dir else {},
+        "fixture_tolerance": fixture_tolerance,
+        "latency_ms": latency_ms,
+        "jitter_ms": jitter_ms,
+        "error_rate": error_rate,
+        "error_status": error_status,
+        "rng": random.Random(seed),
+        "rng_lock": threading.Lock(),
+    })
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def start_background(**kwargs) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Démarre le serveur dans un thread et retourne (serveur, URL de l'archive).
+    Arrêter avec `server.shutdown()`.
+    """
+    server = make_server(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}/v1/archive"
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serveur local imitant l'API d'archive Open-Meteo.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", default=None, help="Dossier de réponses enregistrées (*.json)")
+    parser.add_argument("--fixture-tolerance", type=float, default=FIXTURE_TOLERANCE,
+                        help="Écart maximal (degrés) entre la demande et une réponse enregistrée")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Proportion de réponses en erreur (0-1)")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    server = make_server(args.host, args.port, args.fixtures, args.latency_ms,
+                         args.jitter_ms, args.error_rate, args.error_status, args.seed,
+                         args.fixture_tolerance)
+    print(f"Archive locale sur http://{args.host}:{args.port}/v1/archive")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
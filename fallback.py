@@ -0,0 +1,101 @@
+"""
+Températures simulées utilisées quand l'API d'archive ne répond pas.
+
+Toute l'année est générée d'un bloc : plage de dates, jour de l'année,
+température de saison lue par indice de mois, et un seul générateur
+aléatoire initialisé par l'année (résultats reproductibles).
+
+Quand le cache contient déjà de l'historique pour le lieu, `fallback_year`
+tire plutôt l'année dans la climatologie de la ville (voir climatology.py) ;
+les températures de base européennes ne servent qu'en l'absence d'historique.
+"""
+
+from datetime import date
+from typing import Iterable, Optional
+
+import numpy as np
+
+from climatology import get_climatology
+from compact_series import CompactSeries
+from weather_cache import WeatherCache
+
+# Températures de base par saison (approximatives pour l'Europe)
+SEASON_BASE_TEMPS = {
+    "winter": 2.0,
+    "spring": 12.0,
+    "summer": 22.0,
+    "autumn": 15.0,
+}
+
+# Température de saison par mois (indice 0 = janvier)
+MONTH_BASE_TEMPS = np.array([SEASON_BASE_TEMPS[season] for season in (
+    "winter", "winter", "spring", "spring", "spring", "summer",
+    "summer", "summer", "autumn", "autumn", "autumn", "winter",
+)])
+
+# Décalage de chaque type de température par rapport à la moyenne ; les
+# agrégations horaires (température à 8 h, nuit, jour) s'en déduisent aussi.
+# L'amplitude est simulée à part
+TYPE_OFFSETS = {"min": -5.0, "max": 5.0, "moyenne": 0.0, "08h": -3.0, "nuit": -4.0, "jour": 3.0}
+
+DAILY_NOISE_STD = 3.0
+SEASONAL_AMPLITUDE = 5.0
+
+# Amplitude journalière (max - min) : écart toujours positif, plus marqué en
+# été ; elle ne suit pas la température de saison
+AMPLITUDE_BASE = 8.0
+AMPLITUDE_PER_DEGREE = 0.3
+AMPLITUDE_NOISE_STD = 1.5
+AMPLITUDE_MIN = 1.0
+
+
+def simulate_years(years: Iterable[int], temp_type: str) -> np.ndarray:
+    """
+    Plusieurs années d'un coup : tableau (années x 366) en °C arrondis au
+    dixième ; la ligne d'une année non bissextile se termine par NaN.
+    Chaque année a son propre générateur, initialisé par l'année : une ligne
+    ne dépend pas des autres années demandées. Lève KeyError pour un type inconnu.
+    """
+    if temp_type not in TYPE_OFFSETS and temp_type != "amplitude":
+        raise KeyError(f"Type de température '{temp_type}' inconnu")
+    years = [int(year) for year in years]
+    starts = np.array([f"{year:04d}-01-01" for year in years], dtype="datetime64[D]")
+    offsets = np.arange(366)
+    days = starts[:, None] + offsets
+    months = days.astype("datetime64[M]").astype(np.int64) % 12
+    in_year = days.astype("datetime64[Y]") == starts.astype("datetime64[Y]")[:, None]
+
+    noise = np.empty((len(years), 366))
+    for row, year in enumerate(years):
+        noise[row] = np.random.default_rng(year).normal(0, 1, 366)
+    if temp_type == "amplitude":
+        temperatures = np.maximum(AMPLITUDE_MIN,
+                                  AMPLITUDE_BASE
+                                  + (MONTH_BASE_TEMPS[months] - MONTH_BASE_TEMPS.mean()) * AMPLITUDE_PER_DEGREE
+                                  + noise * AMPLITUDE_NOISE_STD)
+    else:
+        temperatures = (MONTH_BASE_TEMPS[months]
+                        + np.sin((offsets + 1) / 365 * 2 * np.pi) * SEASONAL_AMPLITUDE
+                        + noise * DAILY_NOISE_STD
+                        + TYPE_OFFSETS[temp_type])
+    return np.where(in_year, np.rint(temperatures * 10) / 10, np.nan)
+
+
+def simulate_year(year: int, temp_type: str) -> CompactSeries:
+    """
+    Série simulée du 1er janvier au 31 décembre de `year`.
+    """
+    temperatures = simulate_years([year], temp_type)[0]
+    return CompactSeries.from_floats(date(year, 1, 1), temperatures[~np.isnan(temperatures)])
+
+
+def fallback_year(lat: float, lon: float, year: int, temp_type: str,
+                  cache: Optional[WeatherCache] = None) -> CompactSeries:
+    """
+    Série de secours d'un lieu : tirée de sa climatologie si l'historique en
+    cache le permet, sinon simulée avec les valeurs par défaut.
+    """
+    climatology = get_climatology(lat, lon, temp_type, cache)
+    if climatology is not None:
+        return climatology.sample_year(year)
+    return simulate_year(year, temp_type)
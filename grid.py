@@ -0,0 +1,47 @@
+"""
+Alignement des coordonnées sur la grille de réanalyse du fournisseur.
+
+La grille de l'archive Open-Meteo (ERA5-Land, 0,1°) est plus grossière que
+les coordonnées des villes : plusieurs villes proches tombent dans la même
+maille et reçoivent exactement la même série. Aligner les coordonnées sur
+le centre de la maille avant la recherche en cache évite de télécharger et
+de stocker plusieurs copies.
+"""
+
+import os
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+# Résolution de la grille (degrés) et activation, configurables par variables d'environnement
+GRID_RESOLUTION = float(os.environ.get("TEMPBLINK_GRID_RESOLUTION", "0.1"))
+SNAP_TO_GRID = os.environ.get("TEMPBLINK_SNAP_TO_GRID", "0") == "1"
+
+
+def snap_to_grid(lat: float, lon: float, resolution: float = GRID_RESOLUTION) -> Tuple[float, float]:
+    """
+    Retourne le point de grille le plus proche de (lat, lon).
+    """
+    # L'arrondi final supprime le bruit flottant (48.900000000000006 -> 48.9)
+    return (round(round(lat / resolution) * resolution, 6),
+            round(round(lon / resolution) * resolution, 6))
+
+
+def location_key(lat: float, lon: float) -> Tuple[float, float]:
+    """
+    Coordonnées utilisées pour le cache et l'API : alignées sur la grille si
+    l'option est activée, inchangées sinon.
+    """
+    if SNAP_TO_GRID:
+        return snap_to_grid(lat, lon)
+    return lat, lon
+
+
+def cell_groups(cities: Dict[str, Tuple[float, float]],
+                resolution: float = GRID_RESOLUTION) -> Dict[Tuple[float, float], List[str]]:
+    """
+    Regroupe les villes par maille de grille (utile pour mesurer les doublons).
+    """
+    groups: Dict[Tuple[float, float], List[str]] = defaultdict(list)
+    for city, (lat, lon) in cities.items():
+        groups[snap_to_grid(lat, lon, resolution)].append(city)
+    return dict(groups)
@@ -0,0 +1,174 @@
+"""
+Mode horaire : température heure par heure et agrégations journalières.
+
+Le tableau horaire d'une année est remis en forme en un bloc (jours x 24),
+puis chaque agrégation (température à 8 h, amplitude, moyenne de nuit...)
+est calculée en une seule opération vectorisée sur ce bloc. Le bloc brut et
+les séries dérivées sont stockés dans le cache persistant.
+"""
+
+import warnings
+from datetime import date
+from functools import partial
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from archive_client import get_archive
+from compact_series import CompactSeries
+from grid import location_key
+from weather_cache import WeatherCache, get_cache
+from weather_fetch import CURRENT_YEAR_TTL, ArchiveDataError, loads, refresher, single_flight
+
+HOURLY_VARIABLE = "temperature_2m"
+
+# Clé de cache du bloc horaire brut (aplati heure par heure)
+RAW_KEY = "hourly:temperature_2m"
+
+# Nuit : de NIGHT_START h la veille à NIGHT_END h le jour même
+NIGHT_START = 22
+NIGHT_END = 6
+DAY_HOURS = list(range(8, 20))
+
+
+def night_mean(block: np.ndarray) -> np.ndarray:
+    """
+    Moyenne de la nuit qui se termine le matin de chaque jour : soirée de la
+    veille (décalée d'une ligne) et petit matin du jour. Le premier jour du
+    bloc n'a pas de veille : seul son petit matin compte.
+    """
+    evening = np.vstack([np.full((1, 24 - NIGHT_START), np.nan), block[:-1, NIGHT_START:]])
+    return np.nanmean(np.hstack([evening, block[:, :NIGHT_END]]), axis=1)
+
+
+# Agrégations journalières : nom -> (libellé, fonction bloc (jours x 24) -> tableau (jours,))
+HOURLY_AGGREGATES: Dict[str, Tuple[str, Callable[[np.ndarray], np.ndarray]]] = {
+    "08h": ("Température à 8 h", lambda block: block[:, 8]),
+    "amplitude": ("Amplitude journalière", lambda block: np.nanmax(block, axis=1) - np.nanmin(block, axis=1)),
+    "nuit": ("Moyenne de nuit (22 h - 6 h)", night_mean),
+    "jour": ("Moyenne de jour (8 h - 20 h)", lambda block: np.nanmean(block[:, DAY_HOURS], axis=1)),
+}
+
+
+def to_daily_block(values: np.ndarray) -> np.ndarray:
+    """
+    Remet un tableau horaire en bloc (jours x 24), en complétant le dernier jour par NaN.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n_days = -(-len(values) // 24)
+    padded = np.full(n_days * 24, np.nan)
+    padded[:len(values)] = values
+    return padded.reshape(n_days, 24)
+
+
+def compute_daily_aggregates(block: np.ndarray, names=None) -> Dict[str, np.ndarray]:
+    """
+    Calcule les agrégations demandées (toutes par défaut) sur le bloc horaire.
+    Les jours entièrement vides donnent NaN.
+    """
+    names = list(names or HOURLY_AGGREGATES)
+    empty_days = np.isnan(block).all(axis=1)
+    results = {}
+    with warnings.catch_warnings():
+        # Jour vide ou tranche horaire vide sur un jour partiel : NaN attendu.
+        # Le bloc est passé tel quel : la nuit lit aussi la soirée de la veille
+        warnings.simplefilter("ignore", RuntimeWarning)
+        for name in names:
+            values = HOURLY_AGGREGATES[name][1](block)
+            results[name] = np.where(empty_days, np.nan, values)
+    return results
+
+
+def _request_hourly(lat: float, lon: float, start: date, end: date) -> Tuple[date, np.ndarray]:
+    params = {
+        "latitude": lat,
+        "longitude": lon,
+        "start_date": start.isoformat(),
+        "end_date": end.isoformat(),
+        "hourly": HOURLY_VARIABLE,
+        "timezone": "auto",
+    }
+    response = get_archive(params)
+    response.raise_for_status()
+    hourly = loads(response.content).get("hourly") or {}
+    if "time" not in hourly or HOURLY_VARIABLE not in hourly or not hourly["time"]:
+        raise ArchiveDataError("Structure de données horaires inattendue de l'API")
+    return date.fromisoformat(hourly["time"][0][:10]), np.array(hourly[HOURLY_VARIABLE], dtype=np.float64)
+
+
+def _download_hourly(lat: float, lon: float, year: int, cache: WeatherCache) -> Tuple[date, np.ndarray]:
+    """
+    Télécharge l'année, puis enregistre le bloc brut et toutes les agrégations dérivées.
+    """
+    today = date.today()
+    start, values = _request_hourly(lat, lon, date(year, 1, 1), min(date(year, 12, 31), today))
+    block = to_daily_block(values)
+    if np.isnan(block).all():
+        raise ArchiveDataError(f"Aucune donnée horaire pour {year}")
+
+    # Une année close et complète n'expire pas
+    complete = year < today.year and len(block) >= 365 and not np.isnan(block[-1]).all()
+    ttl = None if complete else CURRENT_YEAR_TTL
+    cache.put_series(lat, lon, year, RAW_KEY, CompactSeries.from_floats(start, block.ravel()), ttl)
+    for name, daily in compute_daily_aggregates(block).items():
+        cache.put_series(lat, lon, year, f"hourly:{name}", CompactSeries.from_floats(start, daily), ttl)
+    return start, block
+
+
+def _revalidate(lat: float, lon: float, year: int, variable: str, cache: WeatherCache) -> bool:
+    if not cache.is_stale(lat, lon, year, variable):
+        return False
+    return refresher.submit((lat, lon, year, "hourly"), partial(_download_hourly, lat, lon, year, cache))
+
+
+def revalidate_hourly(lat: float, lon: float, year: int, name: str,
+                      cache: Optional[WeatherCache] = None) -> bool:
+    """
+    Planifie le téléchargement en arrière-plan d'une année horaire si
+    l'agrégation `name` a expiré. Retourne True si une mise à jour a été planifiée.
+    """
+    cache = cache or get_cache()
+    lat, lon = location_key(lat, lon)
+    return _revalidate(lat, lon, year, f"hourly:{name}", cache)
+
+
+def fetch_hourly_block(lat: float, lon: float, year: int,
+                       cache: Optional[WeatherCache] = None) -> Tuple[date, np.ndarray]:
+    """
+    Retourne (premier jour, bloc jours x 24) d'une année, depuis le cache ou l'API.
+
+    Chaque nouveau bloc est enregistré avec toutes les agrégations journalières
+    dérivées. Une entrée expirée est servie immédiatement et relue en arrière-plan.
+    Les demandes simultanées pour le même lieu et la même année partagent le téléchargement.
+    Lève `requests.exceptions.RequestException` ou `ArchiveDataError` en cas d'échec.
+    """
+    cache = cache or get_cache()
+    lat, lon = location_key(lat, lon)
+
+    series = cache.get_series(lat, lon, year, RAW_KEY)
+    if series is not None:
+        _revalidate(lat, lon, year, RAW_KEY, cache)
+        return series.start, to_daily_block(series.to_floats())
+    return single_flight(lat, lon, year, "hourly", partial(_download_hourly, lat, lon, year, cache))
+
+
+def fetch_hourly_aggregate(lat: float, lon: float, year: int, name: str,
+                           cache: Optional[WeatherCache] = None) -> pd.DataFrame:
+    """
+    Retourne le DataFrame (date, temperature) d'une agrégation journalière
+    calculée à partir des données horaires.
+    """
+    if name not in HOURLY_AGGREGATES:
+        raise KeyError(f"Agrégation horaire '{name}' inconnue")
+    cache = cache or get_cache()
+    lat, lon = location_key(lat, lon)
+
+    derived = cache.get_series(lat, lon, year, f"hourly:{name}")
+    if derived is not None:
+        _revalidate(lat, lon, year, f"hourly:{name}", cache)
+        return derived.to_frame()
+
+    start, block = fetch_hourly_block(lat, lon, year, cache)
+    daily = compute_daily_aggregates(block, [name])[name]
+    return CompactSeries.from_floats(start, daily).to_frame()
@@ -0,0 +1,155 @@
+"""
+Limiteur de débit partagé par tout le processus.
+
+Deux mécanismes sont combinés :
+- un seau à jetons de petite capacité lisse le débit (pas de rafale de
+  plus de `burst` appels) ;
+- des fenêtres glissantes (par minute, par jour) comptent les appels
+  réellement accordés et ne laissent jamais passer plus de N appels sur
+  une durée quelconque de la fenêtre.
+
+Les appelants attendent leur tour dans une file FIFO, chacun avec une
+échéance au-delà de laquelle il abandonne. L'horloge est injectable pour
+les tests.
+"""
+
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional
+
+DEFAULT_BURST = 10
+
+
+class TokenBucket:
+    """
+    Seau de `capacity` jetons, rempli à raison de `rate` jetons par seconde.
+    """
+
+    def __init__(self, capacity: float, rate: float, now: float):
+        self.capacity = float(capacity)
+        self.rate = float(rate)
+        self.tokens = self.capacity
+        self.updated = now
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Secondes avant qu'un jeton soit disponible."""
+        self.refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+
+class SlidingWindow:
+    """
+    Au plus `limit` appels sur toute période de `period` secondes.
+    """
+
+    def __init__(self, limit: int, period: float):
+        self.limit = int(limit)
+        self.period = float(period)
+        self._calls: Deque[float] = deque()
+
+    def _prune(self, now: float) -> None:
+        while self._calls and self._calls[0] <= now - self.period:
+            self._calls.popleft()
+
+    def wait_time(self, now: float) -> float:
+        """Secondes avant qu'un appel redevienne possible."""
+        self._prune(now)
+        if len(self._calls) < self.limit:
+            return 0.0
+        return self._calls[0] + self.period - now
+
+    def take(self, now: float) -> None:
+        self._calls.append(now)
+
+    def count(self, now: float) -> int:
+        """Appels accordés sur la dernière période."""
+        self._prune(now)
+        return len(self._calls)
+
+
+class QuotaLimiter:
+    """
+    Seau de lissage + fenêtres glissantes, avec file d'attente FIFO et échéances.
+    """
+
+    def __init__(self, windows: Dict[str, tuple], rate_per_second: float,
+                 burst: int = DEFAULT_BURST, clock: Callable[[], float] = time.monotonic):
+        # windows : nom -> (nombre d'appels maximum, période en secondes)
+        self.clock = clock
+        self.bucket = TokenBucket(burst, rate_per_second, clock())
+        self.windows = {name: SlidingWindow(limit, period) for name, (limit, period) in windows.items()}
+        self._cond = threading.Condition()
+        self._tickets = itertools.count()
+        self._queue = []
+        self.granted = 0
+        self.rejected = 0
+        self.waited = 0.0
+
+    def _wait_time(self, now: float) -> float:
+        return max([self.bucket.wait_time(now)] + [w.wait_time(now) for w in self.windows.values()])
+
+    def _grant(self, now: float) -> None:
+        self.bucket.take()
+        for window in self.windows.values():
+            window.take(now)
+        self.granted += 1
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Obtient le droit de faire un appel. Retourne False si l'échéance serait
+        dépassée avant (aucun appel n'est alors compté).
+        """
+        started = self.clock()
+        deadline = None if timeout is None else started + timeout
+        with self._cond:
+            ticket = next(self._tickets)
+            self._queue.append(ticket)
+            try:
+                while True:
+                    now = self.clock()
+                    if self._queue[0] == ticket:
+                        delay = self._wait_time(now)
+                        if delay == 0:
+                            self._grant(now)
+                            self.waited += now - started
+                            return True
+                        if deadline is not None and now + delay > deadline:
+                            self.rejected += 1
+                            return False
+                        self._cond.wait(delay)
+                    else:
+                        if deadline is not None and now >= deadline:
+                            self.rejected += 1
+                            return False
+                        self._cond.wait(None if deadline is None else deadline - now)
+            finally:
+                self._queue.remove(ticket)
+                self._cond.notify_all()
+
+    def stats(self) -> Dict[str, object]:
+        """
+        Appels réellement accordés sur chaque fenêtre (et limite), appels
+        accordés et refusés depuis le démarrage, attente cumulée et taille de la file.
+        """
+        with self._cond:
+            now = self.clock()
+            windows = {}
+            for name, window in self.windows.items():
+                calls = window.count(now)
+                windows[name] = {"calls": calls, "limit": window.limit, "used_pct": 100 * calls / window.limit}
+            return {
+                "windows": windows,
+                "granted": self.granted,
+                "rejected": self.rejected,
+                "waited_s": round(self.waited, 3),
+                "queued": len(self._queue),
+            }
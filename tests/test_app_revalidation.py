@@ -0,0 +1,54 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import weather_fetch
+from weather_cache import WeatherCache
+
+code_comp2 = pytest.importorskip("code_comp2")
+
+PARIS = (48.8566, 2.3522)
+
+
+def make_record(start: str, end: str) -> pd.DataFrame:
+    dates = pd.date_range(start, end, freq="D")
+    record = pd.DataFrame({"date": dates})
+    for offset, variable in zip((-5.0, 5.0, 0.0), weather_fetch.DAILY_VARIABLES.values()):
+        record[variable] = np.full(len(dates), 10.0 + offset)
+    return record
+
+
+def wait_for_refresher(timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while weather_fetch.refresher.stats()["pending"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_expired_entry_is_refreshed_through_the_app(tmp_path, monkeypatch):
+    cache = WeatherCache(str(tmp_path / "cache.sqlite"))
+    monkeypatch.setattr(code_comp2, "get_cache", lambda: cache)
+    monkeypatch.setattr(weather_fetch, "get_cache", lambda: cache)
+    requests_made = []
+
+    def request_record(lat, lon, start, end):
+        requests_made.append((start, end))
+        return make_record(start.isoformat(), end.isoformat())
+
+    monkeypatch.setattr(weather_fetch, "_request_record", request_record)
+    code_comp2.get_real_temperature_series.clear()
+
+    # Année close enregistrée incomplète, déjà expirée
+    cache.put_record(*PARIS, 2021, make_record("2021-01-01", "2021-06-30"), ttl=0)
+    time.sleep(0.01)
+    refreshed = weather_fetch.refresher.stats()["refreshed"]
+
+    assert len(code_comp2.generate_temperature_data("Paris, France", 2021, "moyenne")) == 181
+    wait_for_refresher()
+    assert weather_fetch.refresher.stats()["refreshed"] == refreshed + 1
+    assert [(start.isoformat(), end.isoformat()) for start, end in requests_made] == [("2021-07-01", "2021-12-31")]
+
+    # La nouvelle version est servie au rendu suivant
+    assert len(code_comp2.generate_temperature_data("Paris, France", 2021, "moyenne")) == 365
+    assert not cache.is_stale(*PARIS, 2021, weather_fetch.DAILY_VARIABLES["moyenne"])
@@ -0,0 +1,43 @@
+import time
+
+import pytest
+import requests
+
+import archive_client
+from circuit_breaker import CircuitBreaker
+
+
+class TimeoutSession:
+    """Session dont chaque requête échoue par dépassement de délai."""
+
+    def __init__(self):
+        self.calls = []
+
+    def get(self, url, params=None, timeout=None):
+        self.calls.append(timeout)
+        raise requests.exceptions.ReadTimeout("lecture trop longue")
+
+
+@pytest.fixture
+def session(monkeypatch):
+    session = TimeoutSession()
+    monkeypatch.setattr(archive_client, "get_session", lambda: session)
+    monkeypatch.setattr(archive_client, "breaker", CircuitBreaker(100, 60))
+    monkeypatch.setattr(archive_client, "backoff_delay", lambda attempt, retry_after=None: 0.2)
+    return session
+
+
+def test_total_timeout_stops_retries(session):
+    started = time.perf_counter()
+    with pytest.raises(requests.exceptions.Timeout):
+        archive_client.get_archive({}, url="http://archive.invalid", max_retries=50, total_timeout=0.5)
+    assert time.perf_counter() - started < 1.0
+    assert len(session.calls) <= 3
+
+
+def test_attempt_timeouts_capped_by_total_timeout(session):
+    with pytest.raises(requests.exceptions.Timeout):
+        archive_client.get_archive({}, url="http://archive.invalid", connect_timeout=5, read_timeout=15,
+                                   max_retries=0, total_timeout=2)
+    connect, read = session.calls[0]
+    assert connect <= 2 and read <= 2
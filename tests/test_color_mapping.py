@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from color_mapping import (ColorLUT, color_indices, default_breakpoints, evict_palette, get_lut,
+                           quantile_thresholds, threshold_indices)
+
+# Températures au dixième de degré (précision des séries compactes), y compris hors plage
+TEMPERATURES = np.round(np.random.default_rng(0).uniform(-45, 60, 5000), 1)
+
+
+@pytest.mark.parametrize("thresholds", [
+    default_breakpoints(8),
+    default_breakpoints(6, -10.0, 30.0),
+    (-2.5, 0.0, 7.3, 18.05, 31.0),
+    quantile_thresholds(TEMPERATURES, 7),
+])
+def test_lut_matches_direct_search(thresholds):
+    lut = ColorLUT.build(thresholds)
+    np.testing.assert_array_equal(lut.lookup(TEMPERATURES), threshold_indices(TEMPERATURES, thresholds))
+
+
+def test_values_on_thresholds_take_the_upper_color():
+    thresholds = (0.0, 10.0)
+    lut = ColorLUT.build(thresholds)
+    values = np.array([-0.1, 0.0, 9.9, 10.0])
+    np.testing.assert_array_equal(threshold_indices(values, thresholds), [0, 1, 1, 2])
+    np.testing.assert_array_equal(lut.lookup(values), [0, 1, 1, 2])
+
+
+def test_missing_temperatures_take_the_first_color_on_both_paths():
+    values = np.array([np.nan, 50.0, np.nan])
+    thresholds = default_breakpoints(5)
+    np.testing.assert_array_equal(threshold_indices(values, thresholds), [0, 4, 0])
+    np.testing.assert_array_equal(ColorLUT.build(thresholds).lookup(values), [0, 4, 0])
+    np.testing.assert_array_equal(color_indices(values, 5), [0, 4, 0])
+
+
+def test_get_lut_is_cached_and_evicted_per_palette():
+    first = get_lut("Test LUT", 5)
+    assert get_lut("Test LUT", 5) is first
+    assert evict_palette("Test LUT") == 1
+    assert get_lut("Test LUT", 5) is not first
+    evict_palette("Test LUT")
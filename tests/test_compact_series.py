@@ -0,0 +1,33 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from compact_series import MISSING, CompactSeries
+
+
+def test_round_trip_keeps_missing_days():
+    temperatures = np.array([1.25, np.nan, -3.0, np.nan, 40.0])
+    series = CompactSeries.from_floats(date(2024, 2, 28), temperatures)
+    assert series.values[1] == MISSING and series.values[3] == MISSING
+
+    restored = CompactSeries.from_bytes("2024-02-28", series.to_bytes())
+    assert restored == series
+    np.testing.assert_array_equal(np.isnan(restored.to_floats()), np.isnan(temperatures))
+    np.testing.assert_allclose(restored.to_floats()[[0, 2, 4]], [1.2, -3.0, 40.0])
+
+
+def test_frame_round_trip_drops_and_restores_gaps():
+    df = pd.DataFrame({"date": pd.to_datetime(["2024-02-28", "2024-03-01"]), "temperature": [5.0, 6.5]})
+    series = CompactSeries.from_frame(df)
+    # Le 29 février absent devient MISSING
+    assert len(series) == 3 and series.values[1] == MISSING
+    frame = series.to_frame()
+    assert list(frame["date"]) == list(df["date"])
+    assert list(frame["temperature"]) == [5.0, 6.5]
+
+
+def test_extreme_values_never_collide_with_the_sentinel():
+    series = CompactSeries.from_floats(date(2024, 1, 1), np.array([-1e6, 1e6]))
+    assert (series.values != MISSING).all()
+    assert not np.isnan(series.to_floats()).any()
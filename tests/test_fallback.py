@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+
+from fallback import simulate_year
+
+
+def test_simulated_amplitude_is_positive():
+    amplitude = simulate_year(2023, "amplitude").to_floats()
+    assert len(amplitude) == 365
+    assert (amplitude > 0).all()
+
+
+def test_hourly_aggregates_follow_the_mean():
+    mean = simulate_year(2023, "moyenne").to_floats()
+    np.testing.assert_allclose(simulate_year(2023, "nuit").to_floats(), mean - 4.0, atol=0.11)
+    np.testing.assert_allclose(simulate_year(2023, "jour").to_floats(), mean + 3.0, atol=0.11)
+
+
+def test_unknown_type_is_refused():
+    with pytest.raises(KeyError):
+        simulate_year(2023, "mean")
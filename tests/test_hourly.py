@@ -0,0 +1,51 @@
+import threading
+import time
+
+import numpy as np
+
+import hourly
+import weather_fetch
+from hourly import compute_daily_aggregates
+from weather_cache import WeatherCache
+
+
+def test_night_spans_previous_evening_and_early_morning():
+    # Valeur horaire = 10 x numéro du jour + heure / 100 : chaque case est reconnaissable
+    block = np.array([[10.0 * day + hour / 100 for hour in range(24)] for day in range(3)])
+    night = compute_daily_aggregates(block, ["nuit"])["nuit"]
+    # Premier jour : pas de veille, seulement 0 h - 5 h
+    assert np.isclose(night[0], np.mean([h / 100 for h in range(6)]))
+    expected = np.mean([10.0 * 0 + 0.22, 10.0 * 0 + 0.23] + [10.0 + h / 100 for h in range(6)])
+    assert np.isclose(night[1], expected)
+
+
+def test_empty_day_gives_nan_without_breaking_the_next_night():
+    block = np.full((3, 24), 5.0)
+    block[1] = np.nan
+    aggregates = compute_daily_aggregates(block)
+    assert all(np.isnan(values[1]) for values in aggregates.values())
+    # La veille est vide : la nuit suivante ne compte que son petit matin
+    assert aggregates["nuit"][2] == 5.0
+    assert aggregates["amplitude"][0] == 0.0
+
+
+def test_simultaneous_hourly_downloads_are_shared(tmp_path, monkeypatch):
+    cache = WeatherCache(str(tmp_path / "cache.sqlite"))
+    downloads = []
+
+    def request_hourly(lat, lon, start, end):
+        downloads.append(start)
+        time.sleep(0.2)
+        return start, np.arange(24 * 365, dtype=np.float64) % 24
+
+    monkeypatch.setattr(hourly, "_request_hourly", request_hourly)
+    executed = weather_fetch.flight_stats()["executed"]
+    threads = [threading.Thread(target=hourly.fetch_hourly_aggregate, args=(10.0, 10.0, 2020, "amplitude", cache))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(downloads) == 1
+    assert weather_fetch.flight_stats()["executed"] == executed + 1
@@ -0,0 +1,60 @@
+from conftest import FakeClock
+from rate_limit import QuotaLimiter
+
+
+def make_limiter(clock, per_minute=60, per_day=1000, burst=5):
+    return QuotaLimiter({"minute": (per_minute, 60), "jour": (per_day, 86400)},
+                        rate_per_second=per_minute / 60, burst=burst, clock=clock)
+
+
+def test_burst_then_steady_rate():
+    clock = FakeClock()
+    limiter = make_limiter(clock)
+    assert all(limiter.acquire(0) for _ in range(5))
+    assert not limiter.acquire(0)
+    clock.advance(1.0)
+    assert limiter.acquire(0)
+    assert not limiter.acquire(0)
+
+
+def test_minute_window_never_exceeds_limit():
+    clock = FakeClock()
+    limiter = make_limiter(clock, per_minute=60, burst=20)
+    granted = []
+    for _ in range(3000):
+        while limiter.acquire(0):
+            granted.append(clock.now)
+        clock.advance(0.1)
+    assert granted
+    start = 0
+    for end, at in enumerate(granted):
+        while granted[start] <= at - 60:
+            start += 1
+        assert end - start + 1 <= 60
+
+
+def test_day_window_counts_real_calls():
+    clock = FakeClock()
+    limiter = make_limiter(clock, per_minute=600, per_day=30, burst=600)
+    assert sum(limiter.acquire(0) for _ in range(50)) == 30
+    stats = limiter.stats()
+    assert stats["windows"]["jour"]["calls"] == 30
+    assert stats["windows"]["minute"]["calls"] == 30
+    assert stats["granted"] == 30 and stats["rejected"] == 20
+
+    clock.advance(61)
+    assert limiter.stats()["windows"]["minute"]["calls"] == 0
+    assert not limiter.acquire(0)
+    clock.advance(86400)
+    assert limiter.acquire(0)
+    assert limiter.stats()["windows"]["jour"]["calls"] == 1
+
+
+def test_rejection_does_not_consume():
+    clock = FakeClock()
+    limiter = make_limiter(clock, burst=1)
+    assert limiter.acquire(0)
+    assert not limiter.acquire(0.5)
+    clock.advance(1.0)
+    assert limiter.acquire(0)
+    assert limiter.stats()["windows"]["minute"]["calls"] == 2
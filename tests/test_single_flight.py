@@ -0,0 +1,43 @@
+import threading
+import time
+
+import pytest
+
+from single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        release.wait(5)
+        return "résultat"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("clé", fn))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while flight.stats()["coalesced"] < 7 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == ["résultat"] * 8
+    assert flight.stats() == {"executed": 1, "coalesced": 7, "in_flight": 0}
+
+
+def test_error_is_shared_and_key_released():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError("panne")
+
+    with pytest.raises(ValueError):
+        flight.do("clé", fail)
+    assert flight.do("clé", lambda: 2) == 2
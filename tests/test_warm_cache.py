@@ -0,0 +1,19 @@
+import json
+
+import warm_cache
+
+
+def test_manifest_records_city_cells(tmp_path, monkeypatch):
+    monkeypatch.setattr(warm_cache, "SNAP_TO_GRID", True)
+    monkeypatch.setattr(warm_cache, "bulk_fetch", lambda jobs, cache, **kwargs: [])
+    manifest_path = tmp_path / "manifest.json"
+
+    status = warm_cache.main(["--db", str(tmp_path / "cache.sqlite"), "--manifest", str(manifest_path),
+                              "--city", "Paris", "--city", "Lyon", "--start-year", "2021", "--end-year", "2021"])
+
+    assert status == 0
+    grid = json.loads(manifest_path.read_text(encoding="utf-8"))["grid"]
+    assert grid["snap_to_grid"] is True
+    assert grid["city_cells"]["Paris, France"] == [48.9, 2.4]
+    assert grid["city_cells"]["Lyon, France"] == [45.8, 4.8]
+    assert grid["cells"] == 2
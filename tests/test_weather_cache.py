@@ -0,0 +1,33 @@
+import sqlite3
+
+from weather_cache import WeatherCache
+
+# Schéma de la table avant l'ajout de la colonne ttl
+OLD_SCHEMA = """
+CREATE TABLE series (
+    lat REAL NOT NULL, lon REAL NOT NULL, year INTEGER NOT NULL, variable TEXT NOT NULL,
+    start_date TEXT NOT NULL, n_days INTEGER NOT NULL, payload BLOB NOT NULL,
+    fetched_at REAL NOT NULL, PRIMARY KEY (lat, lon, year, variable)
+)
+"""
+
+
+def test_migration_marks_incomplete_years_stale(tmp_path):
+    path = str(tmp_path / "cache.db")
+    rows = {
+        "complete": (2020, "2020-01-01", 366),
+        "truncated": (2021, "2021-01-01", 200),
+        "late_start": (2022, "2022-03-01", 306),
+        "ends_early": (2022, "2022-03-01", 305),
+        "climatology": (0, "2000-01-01", 366),
+    }
+    with sqlite3.connect(path) as conn:
+        conn.execute(OLD_SCHEMA)
+        for variable, (year, start, n_days) in rows.items():
+            conn.execute("INSERT INTO series VALUES (0, 0, ?, ?, ?, ?, x'00', 0)", (year, variable, start, n_days))
+
+    WeatherCache(path)
+
+    with sqlite3.connect(path) as conn:
+        ttl = dict(conn.execute("SELECT variable, ttl FROM series"))
+    assert ttl == {"complete": None, "truncated": 0, "late_start": None, "ends_early": 0, "climatology": None}
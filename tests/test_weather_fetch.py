@@ -0,0 +1,71 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+import weather_fetch
+from weather_cache import WeatherCache
+from weather_fetch import DAILY_VARIABLES, refresh_current_year, split_record_by_year
+
+LOCATION = (45.0, 5.0)
+
+
+def make_record(start: str, end: str, value: float = 10.0) -> pd.DataFrame:
+    record = pd.DataFrame({"date": pd.date_range(start, end, freq="D")})
+    for variable in DAILY_VARIABLES.values():
+        record[variable] = value
+    return record
+
+
+def test_split_record_by_year_across_leap_years():
+    record = make_record("2019-12-30", "2021-01-02")
+    by_year = split_record_by_year(record)
+    assert {year: len(part) for year, part in by_year.items()} == {2019: 2, 2020: 366, 2021: 2}
+    assert pd.Timestamp("2020-02-29") in set(by_year[2020]["date"])
+    assert by_year[2020]["date"].iloc[0] == pd.Timestamp("2020-01-01")
+    assert by_year[2021].index[0] == 0
+
+
+def test_split_record_by_year_empty():
+    assert split_record_by_year(make_record("2020-01-01", "2019-12-31")) == {}
+
+
+def test_refresh_requests_only_the_missing_tail(tmp_path, monkeypatch):
+    cache = WeatherCache(str(tmp_path / "cache.sqlite"))
+    stored = make_record("2020-01-01", "2020-06-30")
+    # Derniers jours présents mais sans valeur : ils sont redemandés
+    stored.loc[stored["date"] >= "2020-06-28", list(DAILY_VARIABLES.values())] = np.nan
+    cache.put_record(*LOCATION, 2020, stored, ttl=0)
+    requests_made = []
+
+    def request_record(lat, lon, start, end):
+        requests_made.append((start, end))
+        return make_record(start.isoformat(), end.isoformat(), value=20.0)
+
+    monkeypatch.setattr(weather_fetch, "_request_record", request_record)
+    refreshed = refresh_current_year(*LOCATION, 2020, stored, cache)
+
+    assert requests_made == [(date(2020, 6, 28), date(2020, 12, 31))]
+    assert len(refreshed) == 366
+    assert refreshed["date"].is_monotonic_increasing and refreshed["date"].is_unique
+    merged = cache.get_record(*LOCATION, 2020, DAILY_VARIABLES.values())
+    mean = merged.set_index("date")[DAILY_VARIABLES["moyenne"]]
+    assert mean["2020-06-27"] == 10.0 and mean["2020-06-28"] == 20.0 and mean["2020-12-31"] == 20.0
+    # Année close et complète : plus d'expiration
+    assert not cache.is_stale(*LOCATION, 2020, DAILY_VARIABLES["moyenne"])
+
+
+def test_refresh_of_a_complete_record_only_touches_it(tmp_path, monkeypatch):
+    cache = WeatherCache(str(tmp_path / "cache.sqlite"))
+    stored = make_record("2020-01-01", "2020-12-31")
+    cache.put_record(*LOCATION, 2020, stored, ttl=0)
+    fetched_at = cache.fetched_at(*LOCATION, 2020, DAILY_VARIABLES["moyenne"])
+
+    def request_record(*args):
+        raise AssertionError("aucun appel attendu")
+
+    monkeypatch.setattr(weather_fetch, "_request_record", request_record)
+    assert refresh_current_year(*LOCATION, 2020, stored, cache) is stored
+    assert cache.fetched_at(*LOCATION, 2020, DAILY_VARIABLES["moyenne"]) >= fetched_at
+    # Marquée à revalider (migration) mais déjà complète : n'expire plus
+    assert not cache.is_stale(*LOCATION, 2020, DAILY_VARIABLES["moyenne"])
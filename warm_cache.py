@@ -0,0 +1,131 @@
+"""
+Préremplissage hors ligne du cache météo pour tout le catalogue CITIES.
+
+Exemple :
+    python warm_cache.py --start-year 2020 --end-year 2024 --db data/weather.sqlite
+
+Le script n'importe pas Streamlit. Il peut être interrompu puis relancé :
+les entrées déjà présentes dans le cache sont ignorées. Un manifeste JSON
+résume le contenu du cache à la fin, avec la maille de grille de chaque ville.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from archive_client import quota_stats
+from bulk_fetch import DEFAULT_RATE_PER_SECOND, DEFAULT_WORKERS, bulk_fetch
+from cities import CITIES
+from grid import GRID_RESOLUTION, SNAP_TO_GRID, cell_groups, snap_to_grid
+from weather_cache import DEFAULT_CACHE_PATH, WeatherCache
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    current_year = datetime.now().year
+    parser = argparse.ArgumentParser(description="Préremplit le cache météo pour les villes du catalogue.")
+    parser.add_argument("--start-year", type=int, default=2020)
+    parser.add_argument("--end-year", type=int, default=current_year - 1,
+                        help="Dernière année incluse (par défaut l'année dernière, complète)")
+    parser.add_argument("--db", default=DEFAULT_CACHE_PATH, help="Fichier SQLite du cache")
+    parser.add_argument("--manifest", default=None,
+                        help="Fichier JSON du manifeste (par défaut à côté du cache)")
+    parser.add_argument("--city", action="append", default=None,
+                        help="Limiter à certaines villes (répétable, sous-chaîne du nom)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE_PER_SECOND,
+                        help="Appels par seconde maximum vers l'API")
+    parser.add_argument("--dedupe-grid", action="store_true",
+                        help="Réindexer les entrées existantes par maille de grille et supprimer les copies "
+                             "(nécessite TEMPBLINK_SNAP_TO_GRID=1)")
+    return parser.parse_args(argv)
+
+
+def select_cities(filters: Optional[List[str]]) -> List[str]:
+    if not filters:
+        return list(CITIES)
+    filters = [f.lower() for f in filters]
+    return [city for city in CITIES if any(f in city.lower() for f in filters)]
+
+
+def city_cells(cities: List[str]) -> Dict[str, Tuple[float, float]]:
+    """
+    Coordonnées sous lesquelles chaque ville est stockée dans le cache : la
+    maille de grille si l'alignement est activé, ses coordonnées sinon.
+    """
+    if not SNAP_TO_GRID:
+        return {city: CITIES[city] for city in cities}
+    groups = cell_groups({city: CITIES[city] for city in cities})
+    return {city: cell for cell, group in groups.items() for city in group}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    cities = select_cities(args.city)
+    years = list(range(args.start_year, args.end_year + 1))
+    if not cities or not years:
+        print("Rien à faire : aucune ville ou aucune année sélectionnée.")
+        return 1
+
+    if args.dedupe_grid and not SNAP_TO_GRID:
+        # Sans alignement, l'application et bulk_fetch chercheraient les
+        # coordonnées exactes : tout serait retéléchargé en double
+        print("--dedupe-grid nécessite TEMPBLINK_SNAP_TO_GRID=1 (sinon les entrées réindexées ne sont plus trouvées).")
+        return 1
+
+    cache = WeatherCache(args.db)
+    cells = city_cells(cities)
+    if SNAP_TO_GRID:
+        print(f"Alignement sur la grille : {len(cities)} villes -> {len(set(cells.values()))} mailles")
+    if args.dedupe_grid:
+        removed = cache.snap_entries(snap_to_grid)
+        print(f"{removed} copies supprimées après alignement sur la grille")
+    jobs = [(city, year, "moyenne") for city in cities for year in years]
+    print(f"{len(cities)} villes x {len(years)} années -> {args.db}")
+
+    started = time.monotonic()
+
+    def report(done: int, total: int) -> None:
+        elapsed = time.monotonic() - started
+        print(f"\r[{done}/{total}] {done * 100 // max(total, 1)}% - {elapsed:.0f} s", end="", flush=True)
+
+    results = bulk_fetch(jobs, cache, max_workers=args.workers,
+                         rate_per_second=args.rate, on_progress=report)
+    print()
+
+    counts = Counter(row["status"] for row in results)
+    errors = [row for row in results if row["status"] == "error"]
+    cache.vacuum()
+
+    manifest = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "database": os.path.abspath(args.db),
+        "years": [years[0], years[-1]],
+        "cities": len(cities),
+        "grid": {
+            "snap_to_grid": SNAP_TO_GRID,
+            "resolution": GRID_RESOLUTION,
+            "cells": len(set(cells.values())),
+            "city_cells": {city: list(cell) for city, cell in cells.items()},
+        },
+        "entries": dict(counts),
+        "errors": errors,
+        "duration_s": round(time.monotonic() - started, 1),
+        "cache": cache.stats(),
+        "quota": quota_stats(),
+    }
+    manifest_path = args.manifest or os.path.splitext(args.db)[0] + "_manifest.json"
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    print(f"Récupérées: {counts['fetched']}, déjà en cache: {counts['cached']}, erreurs: {counts['error']}")
+    print(f"Manifeste: {manifest_path}")
+    return 0 if not errors else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
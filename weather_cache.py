@@ -0,0 +1,352 @@
+"""
+Cache persistant des séries de température (SQLite).
+
+Chaque entrée est indexée par (lat, lon, année, variable) et contient la
+série journalière complète de l'année au format compact (date de début +
+int16 en dixièmes de degré, voir compact_series.py).
+Le fichier survit aux redémarrages de l'application, contrairement à
+`st.cache_data` qui vit uniquement en mémoire.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from datetime import date
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from compact_series import CompactSeries
+
+DEFAULT_CACHE_PATH = os.environ.get(
+    "TEMPBLINK_WEATHER_DB",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "weather.sqlite"),
+)
+
+# Précision des coordonnées dans la clé (≈ 10 m)
+COORD_DECIMALS = 4
+
+_INSERT_SERIES = (
+    "INSERT OR REPLACE INTO series "
+    "(lat, lon, year, variable, start_date, n_days, payload, fetched_at, ttl) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS series (
+    lat REAL NOT NULL,
+    lon REAL NOT NULL,
+    year INTEGER NOT NULL,
+    variable TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    n_days INTEGER NOT NULL,
+    payload BLOB NOT NULL,
+    fetched_at REAL NOT NULL,
+    ttl REAL,
+    PRIMARY KEY (lat, lon, year, variable)
+)
+"""
+
+
+def _key(lat: float, lon: float, year: int, variable: str) -> tuple:
+    return (round(float(lat), COORD_DECIMALS), round(float(lon), COORD_DECIMALS), int(year), variable)
+
+
+def _decode(start: str, n_days: int, payload: bytes) -> CompactSeries:
+    """
+    Décode une charge utile : int16 en dixièmes de degré, ou float64 pour les
+    entrées écrites avant le format compact.
+    """
+    if len(payload) == n_days * 8:
+        return CompactSeries.from_floats(date.fromisoformat(start), np.frombuffer(payload, dtype=np.float64))
+    return CompactSeries.from_bytes(start, payload)
+
+
+class WeatherCache:
+    """
+    Stockage local des séries journalières, consulté avant le réseau.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(series)")]
+            if "ttl" not in columns:
+                # Fichiers créés avant les durées de validité par entrée
+                conn.execute("ALTER TABLE series ADD COLUMN ttl REAL")
+                # L'année en cours était déjà considérée comme ouverte, et une
+                # année close enregistrée incomplète (dernier jour avant le
+                # 31 décembre) l'est aussi : à revalider
+                conn.execute(
+                    "UPDATE series SET ttl = 0 WHERE year >= ? OR (year > 0 AND "
+                    "date(start_date, '+' || (n_days - 1) || ' days') < printf('%04d-12-31', year))",
+                    (date.today().year,),
+                )
+
+    def _connect(self) -> sqlite3.Connection:
+        # Une connexion par opération : sûr entre les threads de Streamlit
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _count(self, attr: str) -> None:
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    def get_series(self, lat: float, lon: float, year: int, variable: str) -> Optional[CompactSeries]:
+        """
+        Retourne la série compacte en cache, ou None si l'entrée est absente.
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT start_date, n_days, payload FROM series "
+                "WHERE lat = ? AND lon = ? AND year = ? AND variable = ?",
+                _key(lat, lon, year, variable),
+            ).fetchone()
+        if row is None:
+            self._count("_misses")
+            return None
+        self._count("_hits")
+        return _decode(*row)
+
+    def get(self, lat: float, lon: float, year: int, variable: str) -> Optional[pd.DataFrame]:
+        """
+        Retourne le DataFrame (date, temperature) en cache, ou None.
+        """
+        series = self.get_series(lat, lon, year, variable)
+        if series is None:
+            return None
+        return series.to_frame()
+
+    def put_series(self, lat: float, lon: float, year: int, variable: str,
+                   series: CompactSeries, ttl: Optional[float] = None) -> None:
+        """
+        Enregistre (ou remplace) une série journalière. `ttl` (secondes) est la
+        durée de validité de l'entrée ; None signifie qu'elle n'expire jamais.
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                _INSERT_SERIES,
+                _key(lat, lon, year, variable)
+                + (series.start.isoformat(), len(series), series.to_bytes(), time.time(), ttl),
+            )
+        self._count("_writes")
+
+    def put(self, lat: float, lon: float, year: int, variable: str, df: pd.DataFrame) -> None:
+        """
+        Enregistre un DataFrame (date, temperature).
+        """
+        if df.empty:
+            return
+        self.put_series(lat, lon, year, variable, CompactSeries.from_frame(df))
+
+    def history(self, lat: float, lon: float, variable: str) -> Dict[int, CompactSeries]:
+        """
+        Retourne toutes les années en cache d'une variable pour un lieu : {année: série}.
+        """
+        lat, lon, _, variable = _key(lat, lon, 0, variable)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT year, start_date, n_days, payload FROM series "
+                "WHERE lat = ? AND lon = ? AND variable = ? AND year > 0 ORDER BY year",
+                (lat, lon, variable),
+            ).fetchall()
+        return {row[0]: _decode(*row[1:]) for row in rows}
+
+    def get_record(self, lat: float, lon: float, year: int,
+                   variables: Iterable[str]) -> Optional[pd.DataFrame]:
+        """
+        Retourne un enregistrement en colonnes (date + une colonne par variable)
+        lu en une seule requête, ou None si l'une des variables manque.
+        """
+        variables = list(variables)
+        lat, lon, year, _ = _key(lat, lon, year, "")
+        placeholders = ", ".join("?" for _ in variables)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT variable, start_date, n_days, payload FROM series "
+                f"WHERE lat = ? AND lon = ? AND year = ? AND variable IN ({placeholders})",
+                [lat, lon, year] + variables,
+            ).fetchall()
+        if len(rows) != len(variables) or len({row[1] for row in rows}) != 1:
+            self._count("_misses")
+            return None
+        self._count("_hits")
+        columns = {row[0]: _decode(*row[1:]).to_floats() for row in rows}
+        n_days = min(len(values) for values in columns.values())
+        record = pd.DataFrame({"date": pd.date_range(rows[0][1], periods=n_days, freq="D")})
+        for variable in variables:
+            record[variable] = columns[variable][:n_days]
+        return record
+
+    def put_record(self, lat: float, lon: float, year: int, record: pd.DataFrame,
+                   ttl: Optional[float] = None) -> None:
+        """
+        Enregistre toutes les colonnes d'un enregistrement (date + variables)
+        dans une seule transaction : un lecteur voit l'ancienne version ou la
+        nouvelle, jamais un mélange.
+        """
+        if record.empty:
+            return
+        fetched_at = time.time()
+        rows = []
+        for variable in record.columns.drop("date"):
+            series = CompactSeries.from_frame(record, variable)
+            rows.append(_key(lat, lon, year, variable)
+                        + (series.start.isoformat(), len(series), series.to_bytes(), fetched_at, ttl))
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(_INSERT_SERIES, rows)
+        self._count("_writes")
+
+    def extend_record(self, lat: float, lon: float, year: int, tail: pd.DataFrame,
+                      ttl: Optional[float] = None) -> pd.DataFrame:
+        """
+        Ajoute la fin d'une série (jours récents) à l'enregistrement stocké et
+        retourne l'enregistrement complet. Les jours déjà présents à partir du
+        début de `tail` sont remplacés.
+        """
+        existing = self.get_record(lat, lon, year, tail.columns.drop("date"))
+        if existing is not None:
+            tail = pd.concat([existing[existing["date"] < tail["date"].min()], tail], ignore_index=True)
+        self.put_record(lat, lon, year, tail, ttl)
+        return tail
+
+    def fetched_at(self, lat: float, lon: float, year: int, variable: str) -> Optional[float]:
+        """
+        Horodatage (epoch) de la dernière écriture d'une entrée, ou None.
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT fetched_at FROM series "
+                "WHERE lat = ? AND lon = ? AND year = ? AND variable = ?",
+                _key(lat, lon, year, variable),
+            ).fetchone()
+        return row[0] if row else None
+
+    def is_stale(self, lat: float, lon: float, year: int, variable: str) -> bool:
+        """
+        Indique si une entrée a dépassé sa durée de validité (False si absente
+        ou sans expiration).
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT fetched_at, ttl FROM series "
+                "WHERE lat = ? AND lon = ? AND year = ? AND variable = ?",
+                _key(lat, lon, year, variable),
+            ).fetchone()
+        return row is not None and row[1] is not None and time.time() > row[0] + row[1]
+
+    def touch(self, lat: float, lon: float, year: int, variables: Iterable[str],
+              ttl: Optional[float]) -> None:
+        """
+        Marque des entrées comme fraîches sans modifier leurs données, avec
+        leur nouvelle durée de validité (None : pas d'expiration).
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "UPDATE series SET fetched_at = ?, ttl = ? "
+                "WHERE lat = ? AND lon = ? AND year = ? AND variable = ?",
+                [(time.time(), ttl) + _key(lat, lon, year, variable) for variable in variables],
+            )
+
+    def invalidate(self, lat: Optional[float] = None, lon: Optional[float] = None,
+                   year: Optional[int] = None, variable: Optional[str] = None) -> int:
+        """
+        Supprime les entrées correspondant aux critères fournis (tous si aucun).
+        Retourne le nombre d'entrées supprimées.
+        """
+        clauses = []
+        params = []
+        if lat is not None:
+            clauses.append("lat = ?")
+            params.append(round(float(lat), COORD_DECIMALS))
+        if lon is not None:
+            clauses.append("lon = ?")
+            params.append(round(float(lon), COORD_DECIMALS))
+        if year is not None:
+            clauses.append("year = ?")
+            params.append(int(year))
+        if variable is not None:
+            clauses.append("variable = ?")
+            params.append(variable)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with closing(self._connect()) as conn, conn:
+            deleted = conn.execute(f"DELETE FROM series{where}", params).rowcount
+        return deleted
+
+    def snap_entries(self, snap: Callable[[float, float], Tuple[float, float]]) -> int:
+        """
+        Réindexe les entrées existantes sur les mailles de grille données par
+        `snap` ; pour chaque maille, seule la copie la plus récente est gardée.
+        Retourne le nombre de copies supprimées.
+        """
+        with closing(self._connect()) as conn, conn:
+            rows = conn.execute(
+                "SELECT rowid, lat, lon, year, variable FROM series ORDER BY fetched_at DESC"
+            ).fetchall()
+            seen = set()
+            removed = 0
+            for rowid, lat, lon, year, variable in rows:
+                key = _key(*snap(lat, lon), year, variable)
+                if key in seen:
+                    conn.execute("DELETE FROM series WHERE rowid = ?", (rowid,))
+                    removed += 1
+                    continue
+                seen.add(key)
+                if key[:2] != (lat, lon):
+                    conn.execute("DELETE FROM series WHERE lat = ? AND lon = ? AND year = ? AND variable = ? "
+                                 "AND rowid != ?", key + (rowid,))
+                    conn.execute("UPDATE series SET lat = ?, lon = ? WHERE rowid = ?", key[:2] + (rowid,))
+        return removed
+
+    def vacuum(self) -> None:
+        """
+        Compacte le fichier SQLite (après de nombreuses écritures ou suppressions).
+        """
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            conn.execute("VACUUM")
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Statistiques du cache : entrées, taille des données, hits/misses du processus.
+        """
+        with closing(self._connect()) as conn:
+            entries, payload_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(payload)), 0) FROM series"
+            ).fetchone()
+        lookups = self._hits + self._misses
+        return {
+            "entries": entries,
+            "payload_bytes": payload_bytes,
+            "file_bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+            "hits": self._hits,
+            "misses": self._misses,
+            "writes": self._writes,
+            "hit_rate": self._hits / lookups if lookups else 0.0,
+        }
+
+
+_default_cache: Optional[WeatherCache] = None
+_default_lock = threading.Lock()
+
+
+def get_cache() -> WeatherCache:
+    """
+    Retourne le cache partagé du processus.
+    """
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = WeatherCache()
+        return _default_cache
@@ -0,0 +1,340 @@
+"""
+Récupération des températures journalières depuis l'API d'archive Open-Meteo.
+
+Ce module ne dépend pas de Streamlit : il peut être utilisé par les
+applications comme par des scripts. Les trois variables journalières
+(min, max, moyenne) sont demandées en un seul appel et stockées ensemble
+dans le cache persistant.
+"""
+
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson  # décodeur JSON plus rapide, optionnel
+except ImportError:
+    orjson = None
+
+from archive_client import get_archive
+from grid import location_key
+from single_flight import SingleFlight
+from weather_cache import COORD_DECIMALS, WeatherCache, get_cache
+
+# Correspondance type de température -> variable Open-Meteo
+DAILY_VARIABLES = {
+    "min": "temperature_2m_min",
+    "max": "temperature_2m_max",
+    "moyenne": "temperature_2m_mean",
+}
+
+# Appels identiques simultanés regroupés en un seul appel réseau
+_flights = SingleFlight()
+
+T = TypeVar("T")
+
+# Durée de validité de l'entrée de l'année en cours (les années closes n'expirent pas)
+CURRENT_YEAR_TTL = 6 * 3600
+
+logger = logging.getLogger(__name__)
+
+
+class ArchiveDataError(ValueError):
+    """Réponse de l'API sans les données attendues."""
+
+
+class BackgroundRefresher:
+    """
+    Revalidation en arrière-plan ("stale-while-revalidate") : l'entrée
+    périmée est servie tout de suite et une seule mise à jour par clé tourne
+    dans un petit pool de threads.
+    """
+
+    def __init__(self, max_workers: int = 2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="revalidate")
+        self._lock = threading.Lock()
+        self._pending = set()
+        self.refreshed = 0
+        self.failed = 0
+
+    def submit(self, key: tuple, fn: Callable[[], object]) -> bool:
+        """
+        Planifie `fn` si aucune mise à jour n'est déjà en cours pour `key`.
+        """
+        with self._lock:
+            if key in self._pending:
+                return False
+            self._pending.add(key)
+        self._executor.submit(self._run, key, fn)
+        return True
+
+    def _run(self, key: tuple, fn: Callable[[], object]) -> None:
+        try:
+            fn()
+            with self._lock:
+                self.refreshed += 1
+        except Exception as e:
+            with self._lock:
+                self.failed += 1
+            logger.warning("Revalidation de %s impossible : %s", key, e)
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"pending": len(self._pending), "refreshed": self.refreshed, "failed": self.failed}
+
+
+refresher = BackgroundRefresher()
+
+
+def entry_ttl(year: int, record: pd.DataFrame) -> Optional[float]:
+    """
+    Durée de validité d'une entrée : aucune expiration pour une année close
+    et complète, CURRENT_YEAR_TTL sinon (année en cours, derniers jours absents).
+    """
+    complete = len(record) > 0 and bool(record.drop(columns="date").iloc[-1].notna().any())
+    if year < date.today().year and complete and record["date"].iloc[-1].date() == date(year, 12, 31):
+        return None
+    return CURRENT_YEAR_TTL
+
+
+def loads(raw: bytes) -> dict:
+    """
+    Décode le corps JSON d'une réponse, avec orjson s'il est installé.
+    """
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def parse_daily_arrays(json_data: dict, variables: Iterable[str] = DAILY_VARIABLES.values()
+                       ) -> Tuple[date, Dict[str, np.ndarray]]:
+    """
+    Extrait (date de début, {variable: tableau float64}) de la réponse JSON.
+
+    Les dates ne sont pas analysées une par une : la série étant journalière
+    et continue, seules la première et la dernière sont lues et vérifiées.
+    Les valeurs nulles deviennent NaN.
+    """
+    daily = json_data.get("daily") or {}
+    variables = list(variables)
+    missing = [v for v in variables if v not in daily]
+    if "time" not in daily or missing:
+        raise ArchiveDataError("Structure de données inattendue de l'API")
+
+    times = daily["time"]
+    if not times:
+        raise ArchiveDataError("Réponse de l'API sans aucune date")
+    start = date.fromisoformat(times[0][:10])
+    if date.fromisoformat(times[-1][:10]) != start + timedelta(days=len(times) - 1):
+        raise ArchiveDataError("Dates de l'API non continues")
+
+    arrays = {}
+    for variable in variables:
+        values = np.array(daily[variable], dtype=np.float64)
+        if len(values) != len(times):
+            raise ArchiveDataError(f"Longueur inattendue pour {variable}")
+        arrays[variable] = values
+    return start, arrays
+
+
+def parse_daily_record(json_data: dict) -> pd.DataFrame:
+    """
+    Construit l'enregistrement en colonnes (date + variables) depuis la réponse JSON.
+    """
+    start, arrays = parse_daily_arrays(json_data)
+    n_days = len(next(iter(arrays.values())))
+    record = pd.DataFrame({"date": pd.date_range(start, periods=n_days, freq="D")})
+    for variable, values in arrays.items():
+        record[variable] = values
+    return record
+
+
+def split_record_by_year(record: pd.DataFrame) -> Dict[int, pd.DataFrame]:
+    """
+    Découpe un enregistrement multi-années en un enregistrement par année.
+
+    Les dates étant triées, les bornes de chaque année sont trouvées par
+    recherche dichotomique sur le tableau datetime64, sans boucle par jour.
+    """
+    dates = record["date"].to_numpy(dtype="datetime64[D]")
+    if len(dates) == 0:
+        return {}
+    first_year, last_year = dates[[0, -1]].astype("datetime64[Y]").astype(int) + 1970
+    years = np.arange(first_year, last_year + 2)
+    boundaries = np.searchsorted(dates, (years - 1970).astype("datetime64[Y]").astype("datetime64[D]"))
+    return {
+        int(year): record.iloc[start:stop].reset_index(drop=True)
+        for year, start, stop in zip(years[:-1], boundaries[:-1], boundaries[1:])
+        if stop > start
+    }
+
+
+def year_spans(years: List[int]) -> List[Tuple[int, int]]:
+    """
+    Regroupe des années en plages consécutives : [2019, 2020, 2022] -> [(2019, 2020), (2022, 2022)].
+    """
+    spans = []
+    for year in sorted(set(years)):
+        if spans and year == spans[-1][1] + 1:
+            spans[-1] = (spans[-1][0], year)
+        else:
+            spans.append((year, year))
+    return spans
+
+
+def _request_record(lat: float, lon: float, start: date, end: date) -> pd.DataFrame:
+    params = {
+        "latitude": lat,
+        "longitude": lon,
+        "start_date": start.isoformat(),
+        "end_date": end.isoformat(),
+        "daily": ",".join(DAILY_VARIABLES.values()),
+        "timezone": "auto",
+    }
+    response = get_archive(params)
+    response.raise_for_status()
+    return parse_daily_record(loads(response.content))
+
+
+def refresh_current_year(lat: float, lon: float, year: int, record: pd.DataFrame,
+                         cache: WeatherCache) -> pd.DataFrame:
+    """
+    Complète une entrée ouverte (année en cours, ou année tout juste close) :
+    seuls les jours après la dernière date renseignée sont demandés, puis
+    ajoutés à la série stockée.
+    """
+    filled = np.flatnonzero(record.drop(columns="date").notna().any(axis=1).to_numpy())
+    if len(filled):
+        start = record["date"].iloc[filled[-1]].date() + timedelta(days=1)
+    else:
+        start = date(year, 1, 1)
+    end = min(date.today(), date(year, 12, 31))
+    if start > end:
+        # Rien de nouveau : l'entrée reste valable (et n'expire plus si l'année est close et complète)
+        cache.touch(lat, lon, year, DAILY_VARIABLES.values(), entry_ttl(year, record))
+        return record
+
+    tail = _request_record(lat, lon, start, end)
+    extended = pd.concat([record[record["date"] < pd.Timestamp(start)], tail], ignore_index=True)
+    return cache.extend_record(lat, lon, year, tail, entry_ttl(year, extended))
+
+
+def _schedule_refresh(lat: float, lon: float, year: int, record: pd.DataFrame, cache: WeatherCache) -> bool:
+    return refresher.submit((lat, lon, year, "daily"),
+                            partial(refresh_current_year, lat, lon, year, record, cache))
+
+
+def revalidate_daily(lat: float, lon: float, year: int, cache: Optional[WeatherCache] = None) -> bool:
+    """
+    Planifie la mise à jour en arrière-plan de l'enregistrement d'une année
+    s'il a expiré. Permet aux appelants qui gardent leur propre copie en
+    mémoire de déclencher la revalidation sans relire l'enregistrement.
+    Retourne True si une mise à jour a été planifiée.
+    """
+    cache = cache or get_cache()
+    lat, lon = location_key(lat, lon)
+    if not cache.is_stale(lat, lon, year, DAILY_VARIABLES["moyenne"]):
+        return False
+    record = cache.get_record(lat, lon, year, DAILY_VARIABLES.values())
+    return record is not None and _schedule_refresh(lat, lon, year, record, cache)
+
+
+def fetch_daily_records(lat: float, lon: float, years: Iterable[int],
+                        cache: Optional[WeatherCache] = None) -> Dict[int, pd.DataFrame]:
+    """
+    Retourne min, max et moyenne journalières de plusieurs années pour un lieu.
+
+    Les années absentes du cache sont regroupées en plages consécutives et
+    chaque plage est demandée en un seul appel, puis découpée en entrées
+    annuelles dans le cache. Une entrée expirée (année en cours) est
+    retournée telle quelle et complétée en arrière-plan avec les jours manquants.
+    Utilisée par les scripts de préchargement (bulk_fetch.py, warm_cache.py) ;
+    l'application ne demande qu'une année à la fois (voir fetch_daily_record).
+    Lève `requests.exceptions.RequestException` ou `ArchiveDataError` en cas d'échec.
+    """
+    cache = cache or get_cache()
+    lat, lon = location_key(lat, lon)
+    records = {}
+    missing = []
+    today = date.today()
+    for year in years:
+        record = cache.get_record(lat, lon, year, DAILY_VARIABLES.values())
+        if record is None:
+            missing.append(year)
+            continue
+        if cache.is_stale(lat, lon, year, DAILY_VARIABLES["moyenne"]):
+            _schedule_refresh(lat, lon, year, record, cache)
+        records[year] = record
+
+    for first_year, last_year in year_spans(missing):
+        end = min(date(last_year, 12, 31), today)
+        if end < date(first_year, 1, 1):
+            continue
+        by_year = split_record_by_year(_request_record(lat, lon, date(first_year, 1, 1), end))
+        for year, record in by_year.items():
+            if year < first_year or year > last_year:
+                continue
+            if record.drop(columns="date").notna().any().any():
+                cache.put_record(lat, lon, year, record, entry_ttl(year, record))
+            records[year] = record
+
+    return records
+
+
+def fetch_daily_record(lat: float, lon: float, year: int,
+                       cache: Optional[WeatherCache] = None) -> pd.DataFrame:
+    """
+    Retourne min, max et moyenne journalières d'une année pour un lieu.
+
+    Le cache persistant est consulté en premier ; sinon un seul appel réseau
+    récupère les trois variables, qui sont ensuite enregistrées ensemble.
+    Les demandes simultanées pour le même lieu et la même année partagent
+    cet appel. Le DataFrame retourné peut donc être partagé : ne pas le modifier.
+    Les années voisines ne sont pas demandées d'avance : le mode plage de
+    `fetch_daily_records` sert au préchargement en masse, pas à l'interface.
+    Lève `requests.exceptions.RequestException` ou `ArchiveDataError` en cas d'échec.
+    """
+    def fetch() -> pd.DataFrame:
+        records = fetch_daily_records(lat, lon, [year], cache)
+        if year not in records:
+            raise ArchiveDataError(f"Aucune donnée pour {year}")
+        return records[year]
+
+    # Les trois variables voyagent ensemble : la clé couvre tout l'enregistrement
+    lat, lon = location_key(lat, lon)
+    return single_flight(lat, lon, year, "daily", fetch)
+
+
+def single_flight(lat: float, lon: float, year: int, kind: str, fn: Callable[[], T]) -> T:
+    """
+    Exécute `fn` au plus une fois à la fois pour un lieu, une année et un type
+    de données ("daily", "hourly") : les appels simultanés partagent son résultat.
+    """
+    key = (round(float(lat), COORD_DECIMALS), round(float(lon), COORD_DECIMALS), int(year), kind)
+    return _flights.do(key, fn)
+
+
+def flight_stats() -> Dict[str, int]:
+    """
+    Compteurs du regroupement des appels : exécutés, regroupés, en cours.
+    """
+    return _flights.stats()
+
+
+def select_temperature(record: pd.DataFrame, temp_type: str) -> pd.DataFrame:
+    """
+    Extrait le DataFrame (date, temperature) d'un type de température, sans valeurs nulles.
+    """
+    variable = DAILY_VARIABLES[temp_type]
+    df = record[["date", variable]].rename(columns={variable: "temperature"})
+    return df.dropna().reset_index(drop=True)